@@ -24,8 +24,9 @@ FROM_IMP = re.compile(r"""
 
 IF_STMT_AND = re.compile(r"""
     ^
-    if\s+
-    (?P<first>.*?)
+    (?=.*:$)
+    if\s+(?!\s)
+    (?P<first>.*?\S)
     \s+and\s+
     (?P<second>.*?):
     $
@@ -34,8 +35,9 @@ IF_STMT_AND = re.compile(r"""
 
 IF_STMT_OR = re.compile(r"""
     ^
-    if\s+
-    (?P<first>.*?)
+    (?=.*:$)
+    if\s+(?!\s)
+    (?P<first>.*?\S)
     \s+or\s+
     (?P<second>.*?):
     $
@@ -3,656 +3,370 @@
 Streaming editor for modifying python files
 This script uses the `sed` python package to programmatically
 inject decorators at the head of function definitions.
+
+Startup matters for short runs and subcommands, so the machinery of a run
+(the editors, the pipeline, the scheduler, the caches) is imported where it
+is first used rather than here.
 """
-import os.path
+import os
 import sys
-import re
+import time
 import logging
-from collections import namedtuple, Counter
+from itertools import tee
+from collections import namedtuple, Counter, deque
 from operator import attrgetter
+from optparse import make_option, OptionParser
 
-from sed.engine import (
-    StreamEditor,
-    call_main,
-    REPEAT, NEXT, CUT, ANY,
-)
-
-from src.table_regex import (
-    MODULE_NAME,
-    PYLINT_ITEM,
-    PYLINT_SEMI_ITEM,
-    PYLINT_ERROR_ITEM,
+from src.item import (
+    Item,
+    item_assert,
 )
-from src.action_regex import (
-    STD_IMPORT,
-    FROM_IMP,
-    IF_STMT_OR,
-    IF_STMT_AND,
-    CONTINUATION,
-    HANGING,
+from src.registry import (
+    FN_TABLE,
+    load,
+    no_op,
 )
-from src.repair_regex import WHITESPACE_TABLE
 
 
 # pylint: disable=logging-format-interpolation
-logging.basicConfig(level=logging.DEBUG)
 LOGGER = logging.getLogger(__name__)
 
 
-Item = namedtuple("Item", ["type", "line_no", "line_offset", "desc", "error"])
+# Settings that travel with each module to the worker that fixes it:
+# - validate: check that the fixed file still compiles
+# - max_line: skip messages on lines longer than this many characters
+# - item_timeout: skip a message whose fixer runs longer than this many seconds
+# - mmap_threshold: memory-map files of at least this many bytes (0: never)
+FixSettings = namedtuple(
+    "FixSettings", ["validate", "max_line", "item_timeout", "mmap_threshold"])
 
+DEFAULT_SETTINGS = FixSettings(
+    validate=True, max_line=4000, item_timeout=2.0, mmap_threshold=1 << 20)
 
-def item_assert(item):
-    """ Assert that Item is correctly constructed """
-    assert isinstance(item.type, str)
-    assert isinstance(item.desc, str)
-    assert isinstance(item.error, str)
-    assert isinstance(item.line_no, int)
-    assert isinstance(item.line_offset, int)
-    assert item.desc
-    assert item.type
-    assert item.error
+# Messages whose fixers consult the project's import graph
+GRAPH_ERRORS = frozenset(["unused-import", "relative-import"])
 
+# Newly computed line fixes kept for the persistent fix cache; older ones are dropped
+MAX_NEW_CACHE_ENTRIES = 100000
 
-def item_maker(match):
-    """ Helper function for making an Item from a dict """
-    return Item(
-        match["type"],
-        int(match["where1"]) - 1,
-        int(match["where2"]),
-        match["desc"].rstrip(),
-        match["error"].rstrip()
-    )
+# Modules with at least this many messages are fixed in regions, in parallel
+DEFAULT_SPLIT_MESSAGES = 5000
 
+# Name under which the merged fixes of a module's regions appear in its history
+MERGED_REGIONS = "<regions>"
 
-def start_of_function_def(editor, start_line):
-    """ Find where a function starts, beginning with `start_line` and working backward """
-    for i in reversed(range(start_line + 1)):
-        if editor.lines[i].lstrip().startswith("def "):
-            return i
-    return None
-
-
-def end_of_function_def(editor, start_line):
-    """ Find where a function ends, beginning with `start_line` and working forward """
-    for i in range(start_line, len(editor.lines)):
-        if editor.lines[i].endswith("):"):
-            return i
-    return None
-
-
-def end_of_string_doc(editor, start_line):
-    """ Find where a docstring ends, beginning with `start_line` and working forward """
-    for i in range(start_line, len(editor.lines)):
-        if editor.lines[i].endswith(('"""', "'''")):
-            return i
-    return None
-
-
-def get_indent(src):
-    """ Helper function to get the leading whitespace from a line """
-    match = re.match(r"^(\s*)(.*)$", src)
-    return match.group(1), match.group(2)
-
-
-def line_split(s, length):
-    """ Helper method to split lines """
-    def get_counts(s, k):
-        """ Calculate indexes where character is 'k' """
-        return [i for i, c in enumerate(s) if c == k]
-
-    #def remove_negative_counts(counts):
-    #    """ Filter the Counter to remove items with non+ counts """
-    #    return Counter({k: v for k, v in counts.items() if v > 0})
-
-    if len(s) <= length:
-        result = [s]
-    elif s.lstrip().startswith("#"):
-        # Hard/annoying to split a long comment
-        result = [s]
-    elif re.match(r"^.*?#.*$", s):
-        ind0, non_indent = get_indent(s)
-        i = non_indent.index('#')
-        non_comment, comment = non_indent[:i].rstrip(), non_indent[i:]
-        if all(len(ind0 + part) < length
-               for part in (comment, non_comment)):
-            result = [
-                ind0 + comment,
-                ind0 + non_comment,
-            ]
-        else:
-            result = None
-    else:
-        ind0, non_indent = get_indent(s)
-        ind1 = ind0 + 2 * "    "
-        m1 = IF_STMT_OR.match(non_indent)
-        m2 = IF_STMT_AND.match(non_indent)
-        if m1 or m2:
-            g, conj = (
-                (m1.groupdict(), " or") if m1 else
-                (m2.groupdict(), " and")
-            )
-            result = [
-                ind0 + "if (",
-                ind1 + g["first"] + conj,
-                ind1 + g["second"],
-                ind0 + "):"
-            ]
-        else:
-            counts = Counter({
-                k: get_counts(s, k)
-                for k in """()[]{}"'"""
-            })
-            # counts = remove_negative_counts(counts)
-
-            cv = [a for a in counts.values() if a]
-            if cv:
-                mi, ma = min(a[0] for a in cv), max(a[-1] for a in cv)
-                pair = s[mi] + s[ma]
-                if pair in {'()', '{}', '[]'}:
-                    result = [
-                        s[:mi + 1],
-                        ind1 + s[mi + 1:ma],
-                        ind0 + s[ma:]
-                    ]
-                else:
-                    result = None
-            else:
-                LOGGER.info("Weird: {0}".format(counts))
-                result = None
-    return result
-
-def find_string(s):
-    """ Find start and end of a quoted string """
-    result = next((i, c) for i, c in enumerate(s) if c in ('"', "'"))
-    if result is not None:
-        start, quote_char = result
-        end = next(
-            i for i, c in enumerate(s[start + 1: ])
-            if c == quote_char and s[i - 1] != '\\'
-        )
-        if end is not None:
-            return (start, start + end + 1)
-    return None, None
 
+class FixerError(Exception):
+    """ A fixer broke its contract with the editor """
+    pass
 
-class DerivedStreamEditor(StreamEditor):
-    """
-    Simple derived class to allow simple stream-editing.
-    """
-    table = [None]
-    def apply_match(self, *_):  # pylint: disable=arguments-differ
-        """ Required method for StreamEditor """
-        pass
 
+def resolve_filename(module_name, root=None):
+    """ Map a module name from the report to the file that holds it, under `root` if given """
+    filename = module_name.replace('.', '/') + ".py"
+    if root is not None:
+        filename = os.path.join(root, filename)
+    if not os.path.exists(filename):
+        tmp_filename = os.path.join(filename[:-3], "__init__.py")
+        if os.path.exists(tmp_filename):
+            filename = tmp_filename
+    return filename
 
-class EditorOptions(object):
-    """ Hack: make an object to initialize StreamEditor """
-    def __init__(self):
-        self.verbose = True
-        self.ext = None
-        self.new_ext = None
-        self.dryrun = False
-
-
-def bad_whitespace(editor, item):
-    """ Pylint method to fix bad-whitespace error """
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    x = WHITESPACE_TABLE.get(item.desc)
-    if x:
-        repaired_line = error_text
-        for regex, repl, kwargs in x:
-            r = re.compile(regex)
-            m = r.match(repaired_line)
-            if not m:
-                LOGGER.debug("No match: {0} | {1}".format(regex, repaired_line))
-            repaired_line = re.sub(regex, repl, repaired_line, **kwargs)
-
-        # Sometimes, these fixes add trailing whitespace to lines
-        repaired_line = repaired_line.rstrip()
-
-        if error_text == repaired_line:
-            LOGGER.debug("Bad whitespace repair: {0}".format(repaired_line))
-            LOGGER.debug("Repair: {0}".format(item.desc))
-            LOGGER.debug("regex applied: {0}".format(x))
-        editor.replace_range((line_no, line_no + 1), [repaired_line])
-    else:
-        LOGGER.info("No match on '{0}'".format(item.desc))
-
-    return (line_no, 0)
-
-
-def bad_continuation(editor, item):
-    """ Pylint method to fix bad-continuation error """
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    m = CONTINUATION.match(item.desc) or HANGING.match(item.desc)
-    if m:
-        g = m.groupdict()
-        verb, count = g.get("verb"), int(g.get("count"))
-        if verb:
-            repaired_line = (
-                error_text[count:] if verb == "remove" else
-                (" " * count) + error_text if verb == "add" else
-                None
-            )
-            if repaired_line is not None:
-                editor.replace_range((line_no, line_no + 1), [repaired_line])
-        else:
-            LOGGER.debug("Missing verb in 'bad_continuation': {0}".format(item.desc))
-    else:
-        LOGGER.debug("No match {1}: {0}".format(error_text, line_no))
-    return (line_no, 0)
-
-
-def trailing_newline(editor, item):
-    """ Pylint method to fix trailing-newline error """
-    line_no = item.line_no
-    loc = (
-        next(
-            x for x in reversed(range(line_no, len(editor.lines)))
-            if not re.match(r'^\s*$', editor.lines[x])
-        ) or line_no,
-        len(editor.lines)
-    )
-    editor.delete_range(loc)
-    return (line_no, loc[1] - loc[0])
-
-
-def no_self_use(editor, item):
-    """ Pylint method to fix no_self_use error """
-    line_no = item.line_no
-    LOGGER.info("no_self_use: {0}".format(line_no))
-    error_text = editor.lines[line_no]
-    LOGGER.info(error_text)
-    decorator_line_no = start_of_function_def(editor, line_no)
-    indent, _ = get_indent(editor.lines[decorator_line_no])
-    editor.lines[line_no] = error_text.replace("self, ", "").replace("(self)", "()")
-    editor.insert_range(decorator_line_no, ["{0}@staticmethod".format(indent)])
-    return (decorator_line_no, 1)
-
-
-def no_value_for_parameter(editor, item):
-    """ Pylint method to fix no_value_for_parameter error """
-    line_no = item.line_no
-    return (line_no, 0)
-
-
-def superfluous_parens(editor, item):
-    """ Pylint method to fix superfluous_parens error """
-    line_no = item.line_no
-    return (line_no, 0)
-
-
-def missing_docstring(editor, item):
-    """ Pylint method to fix missing_docstring error """
-    item_assert(item)
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    indent, rest = get_indent(error_text)
-    new_indent = indent + "    "
-
-    if rest.startswith("def "):
-        func = editor.append_range
-        docstring = '{0}""" Pro forma function/method docstring """'.format(new_indent)
-        i = end_of_function_def(editor, line_no)
-    elif rest.startswith("class "):
-        func = editor.append_range
-        docstring = '{0}""" Pro forma class docstring """'.format(new_indent)
-        i = line_no
-    else:
-        # Missing docstring is at module scope
-        func = editor.insert_range
-        docstring = '""" Pro forma module docstring """'
-        i = line_no
-
-    rep = i is not None
-    if rep:
-        func(i, [docstring])
-    return (line_no, int(rep))
-
-
-def invalid_name(editor, item):
-    """ Pylint method to fix invalid_name error """
-    line_no = item.line_no
-    return (line_no, 0)
-
-
-def unused_import(editor, item):
-    """ Pylint method to fix unused_import error """
-    line_no = item.line_no
-    result = (line_no, 0)
-    error_text = editor.lines[line_no]
-    remove = item.desc.split(' ')[1]
-    m = FROM_IMP.match(error_text)
-    if m:
-        groups = m.groupdict()
-        library = groups["library"]
-        imports = [imp.strip() for imp in groups["imports"].split(',')]
-        LOGGER.debug("imports: {0}".format(imports))
-        LOGGER.debug("remove: {0}".format(remove))
-        final_imports = set(imports) - set([remove])
-        LOGGER.debug("{0}: {1}".format(library, ", ".join(final_imports) or "<empty>"))
-        if not final_imports:
-            # With the import removed, the line has no operative imports -- remove line
-            loc = (line_no, line_no)
-            LOGGER.debug("deleting: {0}".format(loc))
-            LOGGER.debug("0 <= {0} <= {1} <= {2}".format(loc[0], loc[1], len(editor.lines)))
-            editor.delete_range(loc)
-            result = (line_no + 1, -1)
-        else:
-            # Format a new line with the unused removed and the remaining imports sorted
-            repaired_line = "from {0} import {1}".format(
-                library,
-                ", ".join(sorted(final_imports))
-            )
-            loc = (line_no, line_no + 1)
-            editor.replace_range(loc, [repaired_line])
-    return result
-
-
-def misplaced_comparison_constant(editor, item):
-    """ Pylint method to fix misplaced_comparison_constant error """
-    line_no = item.line_no
-    return (line_no, 0)
-
-
-def len_as_condition(editor, item):
-    """ Pylint method to fix len-as-condition error """
-    zero_cmp = re.compile(r'''
-        ^(?P<left>.*?)
-        len\((?P<len>.*?)\)
-        \s+==\s+0
-        (?P<right>.*)$
-    ''', re.VERBOSE)
-    nzero_cmp = re.compile(r'''
-        ^(?P<left>.*?)
-        len\((?P<len>.*?)\)
-        \s+!=\s+0
-        (?P<right>.*)$
-    ''', re.VERBOSE)
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    for reg, fmt in ((zero_cmp, "{left}not {len}{right}"), (nzero_cmp, "{left}{len}{right}")):
-        match = reg.match(error_text)
-        if match:
-            repaired_line = fmt.format(**match.groupdict())
-            loc = (line_no, line_no + 1)
-            editor.replace_range(loc, [repaired_line])
-    return (line_no, 0)
-
-
-def trailing_whitespace(editor, item):
-    """ Pylint method to fix trailing-whitespace error """
-    line_no = item.line_no
-    repaired_line = editor.lines[line_no].rstrip()
-    loc = (line_no, line_no + 1)
-    editor.replace_range(loc, [repaired_line])
-    return (line_no, 0)
-
-
-def ungrouped_imports(editor, item):
-    """ Pylint ungrouped-imports method """
-    line_no = item.line_no
-    return (line_no, 0)
-
-
-def unused_argument(editor, item):
-    """ Pylint unused-argument method """
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    LOGGER.info("unused argument: {0}".format(error_text))
-    return (line_no, 0)
-
-
-def unused_variable(editor, item):
-    """ Pylint unused-variable method """
-    unused_re = re.compile(r"Unused variable '(?P<unused>.*)'")
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    m = unused_re.search(item.desc)
-    unused_var = r"\b{0[unused]}\b".format(m.groupdict())
-    if re.match(r".*except.*as\s+{0}:".format(unused_var), error_text):
-        repaired_line = re.sub(r"\s+as+{0}".format(unused_var), "", error_text)
-    else:
-        repaired_line = re.sub(unused_var, '_', error_text, count=1)
-        loc = (line_no, line_no + 1)
-        editor.replace_range(loc, [repaired_line])
-    return (line_no, 0)
-
-
-def wrong_import_order(editor, item):
-    """ Pylint wrong_import_order method """
-    line_no = item.line_no
-    m = STD_IMPORT.match(item.desc)
-    if m:
-        g = m.groupdict()
-        before, after = (
-            re.compile("^{0}$".format(g[key]))
-            for key in ("before", "after")
-        )
-        before_matches = list(editor.find_line(before))
-        after_matches = list(editor.find_line(after))
-        if len(before_matches) == 1 and len(after_matches) == 1:
-            i, _ = before_matches[0]
-            j, _ = after_matches[0]
-            if i > j:
-                # This case would not be true if a previous item
-                # caused the order to be altered.
-                line_nos = [i] + list(range(j + 1, i)) + [j]
-                new_lines = [editor.lines[x] for x in line_nos]
-                loc = (j, i + 1)
-                assert len(new_lines) == (i + 1 - j)
-                count_before = len(editor.lines)
-                editor.replace_range(loc, new_lines)
-                count_after = len(editor.lines)
-                assert count_before == count_after
-            else:
-                LOGGER.info("Wrong import ordering already fixed")
-    return (line_no, 0)
-
-
-def anomalous_backslash_in_string(editor, item):
-    """ Pylint anomalous-backslash-in-string method """
-    line_no = item.line_no
-    src = editor.lines[line_no]
-    start, end = find_string(src)
-    if (start, end) != (None, None):
-        repaired_line = src[:start] + 'r' + src[start:]
-        loc = (line_no, line_no + 1)
-        editor.replace_range(loc, [repaired_line])
-    else:
-        LOGGER.info("Can't find anomalous string: '{0}'".format(src))
-    return (line_no, 0)
-
-
-def line_too_long(editor, item):
-    """ Pylint line-too-long method """
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    new_lines = line_split(error_text, 100)
-    if not new_lines:
-        LOGGER.info("Could not split: {0}".format(error_text))
-        result = (line_no, 0)
-    else:
-        assert isinstance(new_lines, list), new_lines
-        assert all(isinstance(s, str) for s in new_lines)
-        x = len(new_lines)
-        editor.replace_range((line_no, line_no + 1), new_lines)
-        result = (line_no, x - 1)
-    return result
-
-
-def no_op(_, item):
-    """ Pylint no-op method """
-    line_no = item.line_no
-    LOGGER.info("'{0}' --> no-op".format(item.desc))
-    return (line_no, 0)
-
-
-def relative_import(editor, item):
-    """
-    Pylint relative-import method
-    GIVEN a line that has a relative import in error
-    THEN change the line to have a correct relative import
-    """
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    regex = r"Relative import '(?P<actual>[\w\d\._]+)', should be '(?P<desired>[\w\d\._]+)'"
-    m = re.match(regex, item.desc)
-    if m:
-        g = m.groupdict()
-        actual, desired = g["actual"], g["desired"]
-        regex = r"^(.*?){0}".format(actual)
-        repl = r"\1{0}".format(desired)
-        repaired_line = re.sub(regex, repl, error_text)
-        editor.replace_range((line_no, line_no + 1), [repaired_line])
-    else:
-        LOGGER.debug("No match on regex in relative_import")
-    return (line_no, 0)
-
-
-def dangerous_default_value(editor, item):
-    """
-    Pylint dangerous-default-value method
-    GIVEN a line that has a mutable default argument
-    THEN change the argument to None and add a line that converts a None argument
-    to the required empty type.
-    """
-    line_no = item.line_no
-    error_text = editor.lines[line_no]
-    regex = r'Dangerous default value (?P<default_arg>.*?) as argument'
-    m = re.match(regex, item.desc)
-    if m:
-        default_arg = m.groupdict()["default_arg"]
-        regex = r'^.*(?P<arg_name>[\w\d_]+)(?P<spacing>\s*=\s*){0}.*$'.format(default_arg)
-        m = re.match(regex, error_text)
-        assert m, "No match on arg_name"
-
-        # Set the variable correctly in the function scope
-        # Skip to the end of the function def
-        # Skip the string doc if present
-        i = end_of_function_def(editor, line_no)
-        if (i is not None) and editor.lines[i + 1].lstrip().startswith(('"""', "'''")):
-            j = end_of_string_doc(editor, i + 1)
-            i = i if j is None else j
-
-        if m and (i is not None):
-            g = m.groupdict()
-            arg_name, spacing = tuple(g[arg] for arg in ("arg_name", "spacing"))
-
-            # Fix the declaration in the function's argument list
-            pattern = arg_name + spacing + default_arg
-            repl = arg_name + "=None"
-            new_decl = error_text.replace(pattern, repl)
-
-            # Assign the default argument if the arg is None
-            # HACK: should not assume that function is indented only 4 spaces
-            spacing = "    "
-            new_assign = "{0}{1} = {1} or {2}".format(spacing, arg_name, default_arg)
-
-            # Perform multiple changes atomically
-            editor.replace_range((line_no, line_no + 1), [new_decl])
-            editor.append_range(i, [new_assign])
-            return (i, 1)
-
-    return (line_no, 0)
-
-
-FN_TABLE = {
-    "anomalous-backslash-in-string": anomalous_backslash_in_string,
-    "bad-continuation": bad_continuation,
-    "bad-whitespace": bad_whitespace,
-    "invalid-name": invalid_name,
-    "len-as-condition": len_as_condition,
-    "line-too-long": line_too_long,
-    "misplaced-comparison-constant": misplaced_comparison_constant,
-    "missing-docstring": missing_docstring,
-    "no-self-use": no_self_use,
-    "no-value-for-parameter": no_value_for_parameter,
-    "relative-import": relative_import,
-    "superfluous-parens": superfluous_parens,
-    "trailing-newline": trailing_newline,
-    "trailing-whitespace": trailing_whitespace,
-    "ungrouped-imports": ungrouped_imports,
-    "unused-argument": unused_argument,
-    "unused-import": unused_import,
-    "unused-variable": unused_variable,
-    "wrong-import-order": wrong_import_order,
-    "dangerous-default-value": dangerous_default_value,
-}
-
-
-# pylint: disable=too-few-public-methods
-# StreamEditor class has a minimal interface that a derived
-# class must implement, so pylint is cranky about the number of
-# methods implemented. Silence this warning.
 
 # -----
-class StreamEditorAutoPylint(StreamEditor):
+class StreamEditorAutoPylint(object):
     """
     Implement class for inserting debugging statements into a python file.
     (Reimplemented to use decorators on methods.)
+    The report is parsed by src.report_lexer rather than a StreamEditor table,
+    and the fixed files are saved by the pipeline, so only the StreamEditor
+    interface that main uses is kept, and sed is imported by the editors alone.
     """
-    table = [
-        [[MODULE_NAME, NEXT], ],
-        [[PYLINT_ITEM, REPEAT], [MODULE_NAME, CUT], [PYLINT_SEMI_ITEM, NEXT], ],
-        [[ANY, NEXT], ],
-        [[PYLINT_ERROR_ITEM, 1], [ANY, 1], ],
-    ]
 
-    def apply_match(self, _, dict_matches):
+    def __init__(self, filename, options, edit_journal=None, root=None):
+        # The StreamEditor state, without reading the report: transform streams it
+        self.changes = 0
+        self.verbose = options.verbose
+        self.dryrun = options.dryrun
+        self.new_filename = None
+        self.filename = filename
+        self.lines = []
+        self.matches = []
+        self.journal = edit_journal
+        # Where the modules of the report live (None: the current directory)
+        self.root = root
+        diff_base = getattr(options, "diff_base", None)
+        self.changed = None
+        if diff_base:
+            from src.git_diff import changed_lines
+            self.changed = changed_lines(diff_base)
+        self.workers = getattr(options, "jobs", None) or os.cpu_count() or 1
+        self.settings = FixSettings(
+            validate=getattr(options, "validate", DEFAULT_SETTINGS.validate),
+            max_line=getattr(options, "max_line", DEFAULT_SETTINGS.max_line),
+            item_timeout=getattr(options, "item_timeout", DEFAULT_SETTINGS.item_timeout),
+            mmap_threshold=getattr(options, "mmap_threshold", DEFAULT_SETTINGS.mmap_threshold),
+        )
+        self.read_ahead = getattr(options, "read_ahead", 8)
+        self.max_in_flight = getattr(options, "max_in_flight", None) or 2 * self.workers
+        self.max_bytes = getattr(options, "max_buffered_bytes", 0)
+        self.split_messages = getattr(options, "split_messages", DEFAULT_SPLIT_MESSAGES)
+        self.fsync = getattr(options, "fsync", False)
+        from src import fix_cache, import_graph
+        from src.scheduler import CostModel
+        # Timings are only kept across runs in a file named with --timings
+        self.timings = getattr(options, "timings", None)
+        self.cost_model = CostModel.load(self.timings) if self.timings else CostModel()
+        self.cache_config = (
+            getattr(options, "cache_size", 10000),
+            getattr(options, "fix_cache", None),
+        )
+        fix_cache.configure(*self.cache_config)
+        self.graph_cache = (
+            getattr(options, "import_cache", None) or import_graph.DEFAULT_GRAPH_CACHE
+            if getattr(options, "import_graph", True) else None
+        )
+        # Set by transform (or batch) to the SavedGraph of the project
+        self.graph = None
+        self.cache_hits = self.cache_lookups = 0
+        self.cache_entries = deque(maxlen=MAX_NEW_CACHE_ENTRIES)
+        self.rejected = []
+        # Reports or files that could not be read or written
+        self.errors = []
+        self.failures = 0
+        self.skipped = 0
+        self.modules = self.saved = self.fixes = 0
+        self.fix_seconds = 0.0
+        self.writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # The pipeline has saved the fixed files already
+        pass
+
+    def transform(self):
+        """
+        Fix the modules of the report as it is parsed, through a pipeline with
+        bounded memory: the report is read a module at a time into a work queue,
+        and parsing only runs ahead of the fixers as far as the queue allows.
+        Queued modules are fixed and validated most expensive first, on a pool
+        of worker processes, and the fixed files are written behind.
+        """
+        from src import fix_cache, import_graph
+        from src.pipeline import WriteBehind
+        from src.scheduler import WorkQueue
+        self.graph = self.new_import_graph()
+        if self.graph is not None:
+            import_graph.configure(self.graph)
+        queue = WorkQueue(self.parse_jobs(), self.cost_model)
+        self.writer = WriteBehind(fsync=self.fsync, journal=self.journal)
+        try:
+            for result in self.fix_all(queue):
+                if result is not None:
+                    self.save_result(result)
+        finally:
+            self.writer.close()
+            if self.graph is not None:
+                self.graph.close()
+                import_graph.configure(None)
+        self.write_failed(self.writer.errors)
+        LOGGER.info("Work queue: at most {0} modules buffered".format(queue.peak))
+        if self.timings:
+            self.cost_model.save(self.timings)
+        fix_cache.LINE_CACHE.close()
+        fix_cache.save_entries(self.cache_config[1], self.cache_entries)
+        self.log_summary()
+
+    def write_failed(self, errors):
+        """ Record the (filename, error) failures of the writer: those files are not (safely) saved """
+        for filename, error in errors:
+            self.errors.append("{0}: {1}".format(filename, error))
+            self.saved -= 1
+
+    def log_summary(self):
+        """ Log the cache statistics and whatever went wrong """
+        if self.cache_lookups:
+            LOGGER.info("Line fix cache: {0} hits in {1} lookups ({2:.1%})".format(
+                self.cache_hits, self.cache_lookups, self.cache_hits / self.cache_lookups))
+
+        if self.failures:
+            LOGGER.warning("{0} fixes failed and were rolled back".format(self.failures))
+        if self.skipped:
+            LOGGER.warning("{0} messages skipped on overlong or too slow lines".format(
+                self.skipped))
+        for error in self.errors:
+            LOGGER.error("Not fixed: {0}".format(error))
+        for filename, fixer, error in self.rejected:
+            LOGGER.error("Reverted {0}: {1} produced invalid code ({2})".format(
+                filename, fixer, error))
+
+    def summary(self):
+        """ The counts of the run, as a JSON-able dict """
+        return {
+            "report": self.filename,
+            "root": self.root,
+            "modules": self.modules,
+            "saved": self.saved,
+            "changes": self.fixes,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "rejected": [[filename, fixer, str(error)]
+                         for filename, fixer, error in self.rejected],
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "cache_lookups": self.cache_lookups,
+            "fix_seconds": round(self.fix_seconds, 3),
+        }
+
+    def parse_jobs(self):
+        """ Yield a (filename, items) job for each module of the report, parsing it lazily """
+        from src.report_lexer import parse_report
+        with open(self.filename) as handle:
+            for module, items in parse_report(handle):
+                try:
+                    job = self.make_job(module, items)
+                except Exception:  # pylint: disable=broad-except
+                    LOGGER.exception("Skipping module {0}".format(module))
+                    continue
+                if job is not None:
+                    yield job
+
+    def new_import_graph(self):
+        """
+        An import graph for the run, to be built by make_job before the first
+        job whose messages need it, or None with --no-import-graph
+        """
+        from src import import_graph
+        if self.graph_cache is None:
+            return None
+        root = self.root or "."
+        return import_graph.SavedGraph(
+            root, import_graph.project_cache(root, self.graph_cache), self.workers)
+
+    def fix_all(self, jobs):
+        """ Yield the FixResult of each (filename, items) job, in completion order """
+        from src import import_graph
+        from src.pipeline import read_ahead
+        from src.scheduler import dispatch
+        if self.workers == 1:
+            # In process: read the next files ahead while the current one is fixed
+            # (files to be memory-mapped are left for fix_module to open)
+            jobs, ahead = tee(jobs)
+            sources = read_ahead((filename for filename, _ in ahead), self.read_ahead,
+                                 self.settings.mmap_threshold)
+            for (filename, items), (_, source) in zip(jobs, sources):
+                if isinstance(source, Exception):
+                    LOGGER.error("fix_pylint({0}): {1}".format(filename, source))
+                    continue
+                yield fix_module(filename, items, self.settings, source)
+        else:
+            # Each worker reads its own file, so reads overlap across workers
+            from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+            with ProcessPoolExecutor(self.workers, initializer=initialize_worker,
+                                     initargs=(self.cache_config, import_graph.GRAPH)) as executor, \
+                    ThreadPoolExecutor(self.workers) as splitter:
+                split = deque()
+                jobs = self.module_jobs(executor, splitter, jobs, split)
+                for result in dispatch(executor, fix_module, jobs,
+                                       self.max_in_flight, self.max_bytes):
+                    while split and split[0].done():
+                        yield split.popleft().result()
+                    yield result
+                while split:
+                    yield split.popleft().result()
+
+    def module_jobs(self, executor, splitter, jobs, split):
         """
-        Implement the `apply_match` method to the file.
+        The fix_module arguments of each job for the pool. A module with enough
+        messages to hold up the whole run is fixed in regions spread over the
+        workers instead: fix_split waits on them on a thread of `splitter`,
+        and the future of its FixResult is added to `split`.
         """
-        matches = dict_matches["matches"]
-
-        # Because there can be complete matches and multiple lines which together
-        # make up a match, we have to find them and glue them together. Also,
-        # drop the fragments that have been glued on.
-        deletes = set()
-        lens = map(len, matches)
-        LOGGER.info(lens)
-        indexes = [i for i, l in enumerate(lens) if l == 5]
-        for index in indexes:
-            LOGGER.info(index)
-            sl = slice(index, index + 3)
-            assert lens[sl] == [5, 1, 2]
-            first, last = matches[index], matches[index + 2]
-            assert 'error' in last, last
-            assert 'error' not in first, first
-            first['error'] = last['error']
-            deletes.update([index + 1, index + 2])
-
-        matches = [m for n, m in enumerate(matches) if n not in deletes]
-        assert all(len(m) == 6 for m in matches[1:]), matches[1:]
-        assert all("error" in m for m in matches[1:]), matches[1:]
-        module, items = matches[0], [item_maker(m) for m in matches[1:] if "error" in m]
+        for filename, items in jobs:
+            if self.split_messages and len(items) >= self.split_messages:
+                split.append(splitter.submit(
+                    fix_split, executor, filename, items, self.settings, self.workers))
+            else:
+                yield filename, items, self.settings
+
+    def make_job(self, module, items):
+        """ The (filename, items) job for one module's messages, or None to skip it """
         for item in items:
             item_assert(item)
 
-        filename = module["filename"].replace('.', '/') + ".py"
+        filename = resolve_filename(module, self.root)
+        if self.changed is not None:
+            items = self.changed_items(filename, items)
+            if not items:
+                LOGGER.info("No changed lines with messages in {0}, skipping".format(filename))
+                return None
+        if self.graph is not None and any(item.error in GRAPH_ERRORS for item in items):
+            # Built as the report is parsed, before the first job that needs it is queued
+            self.graph.ensure()
         keyfn = attrgetter('line_no')
-        self.fix_pylint(filename, sorted(items, reverse=True, key=keyfn))
+        return (filename, sorted(items, reverse=True, key=keyfn))
+
+    def save_result(self, result):
+        """ Hand a fixed file to the writer, which journals it if a journal is kept """
+        self.cost_model.update(result.timings)
+        self.modules += 1
+        self.fix_seconds += sum(seconds for seconds, _ in result.timings.values())
+        self.failures += result.failures
+        self.skipped += result.skipped
+        hits, misses, entries = result.cache
+        self.cache_hits += hits
+        self.cache_lookups += hits + misses
+        self.cache_entries.extend(entries)
+        if result.rejected:
+            self.rejected.append((result.filename, ) + result.rejected)
+        if result.data is None:
+            return
+        LOGGER.info("Saving {o.filename}: {o.changes} changes".format(o=result))
+        self.saved += 1
+        self.fixes += result.changes
+        # Memory-mapped files are not sent back: the writer reads the original
+        self.writer.put(result.filename, result.data, result.original)
+
+    def changed_items(self, filename, items):
+        """ Drop the items that are not on lines changed since the diff base """
+        index = self.changed.get(os.path.normpath(filename))
+        if not index:
+            return []
+        return [item for item in items if item.line_no + 1 in index]
 
     @staticmethod
-    def fix_pylint(filename, items):
-        """ Fix all pylint errors that have a matching function """
-        LOGGER.info("Creating StreamEditor for {0}".format(filename))
+    def fix_pylint(filename, items, source=None, settings=DEFAULT_SETTINGS,
+                   editor_class=None, edits=None, changes=0):
+        """
+        Fix all pylint errors that have a matching function.
+        `source` is the file's contents if they have already been read, and
+        `edits` are fixes already computed for it (see fix_split), applied first;
+        `changes` is the number of fixes that made them.
+        Returns the editor holding the fixed (unsaved) text, or None on error.
+        """
+        from src.editor import DerivedStreamEditor, EditorOptions, MappedStreamEditor
+        from src.guard import LineTimeout, time_limit
+        from src.mapped import MappedSource
 
-        affected = Counter()
-        if not os.path.exists(filename):
-            tmp_filename = os.path.join(filename[:-3], "__init__.py")
-            if os.path.exists(tmp_filename):
-                filename = tmp_filename
+        LOGGER.debug("Creating StreamEditor for {0}".format(filename))
 
+        affected = Counter()
+        editor = None
         try:
-            editor = DerivedStreamEditor(filename, options=EditorOptions())
+            editor_class = editor_class or (
+                MappedStreamEditor if isinstance(source, MappedSource) else DerivedStreamEditor
+            )
+            editor = editor_class(filename, EditorOptions(), source)
+            editor.original, editor.history, editor.failures = editor.lines, [], []
+            editor.timings, editor.skipped = {}, []
+            if edits:
+                editor.apply_edits(edits)
+                editor.changes += changes
+                editor.history.append((MERGED_REGIONS, len(editor.deltas)))
             for item in sorted(items, reverse=True, key=lambda x: x.line_no):
-                LOGGER.info("----- Error at {1} is {0}".format(item.error, item.line_no))
-                func = FN_TABLE.get(item.error, no_op)
-                assert func, "{0} does not map to a function?".format(item.error)
+                LOGGER.debug("----- Error at {1} is {0}".format(item.error, item.line_no))
 
                 # Previous changes to the text may have shifted the line
                 # number of the current error. Track these changes and apply
@@ -666,28 +380,420 @@ class StreamEditorAutoPylint(StreamEditor):
                         item.desc,
                         item.error
                     )
-                item_assert(item)
-
-                assert editor, "editor is None"
-                assert item, "item is None"
-                LOGGER.info("Invoking {0}".format(func.__name__))
-                before = len(editor.lines)
-                LOGGER.debug("Before count = {0}".format(before))
-                line_no, count = func(editor, item)
+
+                # Bound the worst case: leave alone lines too long to fix safely
+                if (settings.max_line and item.line_no < len(editor.lines) and
+                        len(editor.lines[item.line_no]) > settings.max_line):
+                    LOGGER.warning("Skipped {0} at {1}:{2}: line is {3} characters long".format(
+                        item.error, filename, item.line_no + 1, len(editor.lines[item.line_no])))
+                    editor.skipped.append((item.error, item))
+                    continue
+
+                # Apply each item as a transaction: a fixer that fails to load,
+                # raises or breaks the line-count contract is rolled back on its own.
+                state = editor.snapshot()
+                start = time.time()
+                name = item.error
+                try:
+                    func = FN_TABLE.get(item.error, no_op)
+                    name = func.__name__
+                    with time_limit(settings.item_timeout):
+                        line_no, count = apply_item(editor, func, item)
+                except LineTimeout as e:
+                    LOGGER.warning("Skipped {0} at {1}:{2}: {3}".format(
+                        name, filename, item.line_no + 1, e))
+                    editor.restore(state)
+                    editor.skipped.append((name, item))
+                    continue
+                except Exception as e:  # pylint: disable=broad-except
+                    LOGGER.warning("{0} failed at {1}:{2}, rolled back: {3!r}".format(
+                        name, filename, item.line_no + 1, e))
+                    editor.restore(state)
+                    editor.failures.append((name, item))
+                    continue
+                finally:
+                    timing = editor.timings.setdefault(item.error, [0.0, 0])
+                    timing[0] += time.time() - start
+                    timing[1] += 1
                 if count:
                     affected[line_no] += count
-                LOGGER.debug("line_no = {0}, count = {1}".format(line_no, count))
-                after = len(editor.lines)
-                LOGGER.debug("After count = {0}".format(after))
-                assert after == before + count
-            editor.save()
+                editor.history.append((name, len(editor.deltas)))
         except IOError:
             LOGGER.exception("fix_pylint({0})".format(filename))
+            editor = None
+        return editor
+
+
+def initialize_worker(cache_config, graph):
+    """ Set up the line fix cache and the import graph of a worker process """
+    from src import fix_cache, import_graph
+
+    fix_cache.configure(*cache_config)
+    import_graph.configure(graph)
+
+
+FixResult = namedtuple(
+    "FixResult",
+    [
+        "filename", "original", "data", "changes",
+        "failures", "skipped", "rejected", "timings", "cache",
+    ]
+)
+
+
+def fix_module(filename, items, settings=DEFAULT_SETTINGS, source=None, edits=None, changes=0):
+    """
+    Read, fix and validate one module; this runs in the worker processes.
+    `edits` and `changes` are the merged fixes of its regions, if any (see fix_split).
+    Returns a FixResult whose `data` is None if there is nothing to save.
+    """
+    from src.mapped import MappedSource
+    from src.pipeline import open_source
+
+    start = time.time()
+    if source is None:
+        try:
+            source = open_source(filename, settings.mmap_threshold)
+        except (IOError, OSError, SyntaxError, UnicodeDecodeError) as e:
+            LOGGER.error("fix_pylint({0}): {1}".format(filename, e))
+            return None
+    try:
+        return fix_source(filename, items, settings, source, start, edits, changes)
+    finally:
+        if isinstance(source, MappedSource):
+            source.close()
+
+
+def fix_source(filename, items, settings, source, start, edits=None, changes=0):
+    """ Fix and validate one module whose source has been opened """
+    from src import fix_cache
+    from src.mapped import MappedSource
+    from src.scheduler import BYTES
+    from src.validate import check_source
+
+    editor = StreamEditorAutoPylint.fix_pylint(
+        filename, items, source, settings, edits=edits, changes=changes)
+    if editor is None:
+        return None
+
+    rejected = None
+    data = editor.encode() if editor.changes else None
+    if settings.validate and data is not None:
+        # Compile the bytes to be saved: a memory-mapped file stays undecoded
+        error = check_source(filename, data)
+        if error:
+            rejected = revert_broken(editor, error)
+            if rejected is not None:
+                data = None
+
+    # The time not spent inside fixers is charged to the size of the file
+    fixer_time = sum(seconds for seconds, _ in editor.timings.values())
+    editor.timings[BYTES] = [time.time() - start - fixer_time, len(source.data)]
+    return FixResult(
+        filename,
+        None if isinstance(source, MappedSource) else source.data,
+        data,
+        editor.changes,
+        len(editor.failures),
+        len(editor.skipped),
+        rejected,
+        editor.timings,
+        fix_cache.LINE_CACHE.take_stats()
+    )
+
+
+RegionResult = namedtuple(
+    "RegionResult", ["edits", "changes", "failures", "skipped", "timings", "cache"])
+
+
+def whole_file(item):
+    """ Whether the fixer of `item` looks beyond the definition around its line """
+    return getattr(FN_TABLE.get(item.error, no_op), "whole_file", False)
+
+
+def fix_region(filename, start, lines, items, settings=DEFAULT_SETTINGS, encoding="utf-8"):
+    """
+    Fix the messages of one region of a module, its `lines` from line `start`;
+    this runs in the worker processes. Returns a RegionResult whose edits are
+    to the lines of the whole module.
+    """
+    from src import fix_cache
+    from src.editor import RegionStreamEditor
+    from src.pipeline import SourceFile
+    from src.regions import region_edits
+
+    source = SourceFile(filename, b"", encoding, lines)
+    items = [item._replace(line_no=item.line_no - start) for item in items]
+    editor = StreamEditorAutoPylint.fix_pylint(
+        filename, items, source, settings, RegionStreamEditor)
+    return RegionResult(
+        region_edits(start, len(lines), editor.lines, editor.origin),
+        editor.changes,
+        len(editor.failures),
+        len(editor.skipped),
+        editor.timings,
+        fix_cache.LINE_CACHE.take_stats()
+    )
+
+
+def fix_split(executor, filename, items, settings=DEFAULT_SETTINGS, parts=2):
+    """
+    Fix one large module on the workers of `executor`: its messages are fixed
+    in up to `parts` regions in parallel, and the edits of the regions merged
+    and validated by one more worker. The module is fixed serially, by another
+    worker, instead if the edits conflict, or if they do not compile together.
+    Only the regions are cut here, so that waiting on the workers holds up
+    nothing but the calling thread. Returns a FixResult, like fix_module.
+    """
+    from src.mapped import MappedSource
+    from src.pipeline import open_source
+    from src.regions import (
+        RegionConflict,
+        map_line,
+        merge_edits,
+        region_bounds,
+        region_items,
+    )
+
+    try:
+        source = open_source(filename, settings.mmap_threshold)
+    except (IOError, OSError, SyntaxError, UnicodeDecodeError) as e:
+        LOGGER.error("fix_pylint({0}): {1}".format(filename, e))
+        return None
+    try:
+        # Fixers that search the whole file run on the merged result
+        whole = [item for item in items if whole_file(item)]
+        local = [item for item in items if not whole_file(item)]
+        bounds = region_bounds(source.lines, local, parts)
+        futures = [
+            executor.submit(fix_region, filename, begin, source.lines[begin:end],
+                            region, settings, source.encoding)
+            for (begin, end), region in zip(bounds, region_items(bounds, local))
+            if region
+        ] if len(bounds) > 1 else []
+        regions = [future.result() for future in futures]
+    finally:
+        if isinstance(source, MappedSource):
+            source.close()
+
+    if regions:
+        try:
+            edits = merge_edits(region.edits for region in regions)
+            whole = [item._replace(line_no=map_line(edits, item.line_no)) for item in whole]
+        except RegionConflict as e:
+            LOGGER.warning("Fixing {0} serially: {1}".format(filename, e))
+        else:
+            LOGGER.info("Fixed {0} in {1} regions".format(filename, len(regions)))
+            changes = sum(region.changes for region in regions)
+            result = executor.submit(
+                fix_module, filename, whole, settings, None, edits, changes).result()
+            rejected = result.rejected if result is not None else None
+            if not rejected or rejected[0] != MERGED_REGIONS:
+                return add_regions(result, regions)
+            LOGGER.warning("Fixing {0} serially: its merged regions do not compile".format(
+                filename))
+    return executor.submit(fix_module, filename, items, settings).result()
+
+
+def add_regions(result, regions):
+    """ Add the counts, timings and cache statistics of the regions of a module to its FixResult """
+    from src.scheduler import BYTES
+
+    if result is None:
+        return None
+    timings = dict(result.timings)
+    # The regions ran in parallel, so the time left over says little about the size
+    timings.pop(BYTES, None)
+    hits, misses, entries = result.cache
+    for region in regions:
+        for key, (seconds, samples) in region.timings.items():
+            total = timings.setdefault(key, [0.0, 0])
+            total[0] += seconds
+            total[1] += samples
+        hits += region.cache[0]
+        misses += region.cache[1]
+        entries = entries + region.cache[2]
+    return result._replace(
+        failures=result.failures + sum(region.failures for region in regions),
+        skipped=result.skipped + sum(region.skipped for region in regions),
+        timings=timings,
+        cache=(hits, misses, entries),
+    )
+
+
+class Replayed(object):
+    """
+    The lines of an editor after each fixer of its history, rebuilt from its
+    recorded edits when asked for: a history entry is (fixer, number of edits
+    made once it ran), so memory does not grow with lines times fixes.
+    """
+    def __init__(self, editor):
+        self.editor = editor
+
+    def __len__(self):
+        return len(self.editor.history)
+
+    def __getitem__(self, index):
+        return self.editor.replay(self.editor.history[index][1])
+
+
+def revert_broken(editor, error):
+    """
+    Restore the original text of a file whose fixes do not compile.
+    Returns (fixer, error) naming the first fixer that broke it, or None if the
+    original does not compile either.
+    """
+    from src.validate import check_source, first_failure, lines_to_source
+
+    if check_source(editor.filename, lines_to_source(editor.original)) is not None:
+        # The original does not compile either (e.g. it is written for another
+        # Python version), so there is nothing to compare against.
+        LOGGER.debug("Not validating {0}: original does not compile".format(editor.filename))
+        return None
+    i = first_failure(editor.filename, Replayed(editor))
+    editor.lines = editor.original
+    editor.changes = 0
+    editor.deltas = []
+    return (editor.history[i][0], error)
+
+
+def apply_item(editor, func, item):
+    """ Run one fixer on one item and check that it reports its line-count change """
+    item_assert(item)
+    LOGGER.debug("Invoking {0}".format(func.__name__))
+    before = len(editor.lines)
+    LOGGER.debug("Before count = {0}".format(before))
+    line_no, count = func(editor, item)
+    LOGGER.debug("line_no = {0}, count = {1}".format(line_no, count))
+    after = len(editor.lines)
+    LOGGER.debug("After count = {0}".format(after))
+    if after != before + count:
+        raise FixerError("line count went from {0} to {1}, expected {2}".format(
+            before, after, before + count))
+    return line_no, count
+
+
+OPTION_LIST = [
+    make_option('-d', '--dry-run', dest="dryrun", action="store_true",
+                default=False, help="Execute commands or just do dry run"),
+    make_option('-e', '--ext', dest="extension",
+                default=None, help="Extension to operate on (.ext)"),
+    make_option('-n', '--new-ext', dest="new_ext",
+                default=None, help="Extension to use in renaming file (.ext)"),
+    make_option('-v', '--verbose', dest="verbose", action="store_true",
+                default=False, help="Verbose output"),
+    make_option('--diff-base', dest="diff_base", default=None, metavar="REV",
+                help="Only fix messages on lines changed since git revision REV"),
+    make_option('-j', '--jobs', dest="jobs", type="int", default=None,
+                help="Number of worker processes (default: one per CPU)"),
+    make_option('--no-validate', dest="validate", action="store_false", default=True,
+                help="Do not check that fixed files still compile before saving"),
+    make_option('--journal', dest="journal", default=None, metavar="FILE",
+                help="Record the edits in FILE so `autopylint revert FILE` can undo them"),
+    make_option('--read-ahead', dest="read_ahead", type="int", default=8, metavar="N",
+                help="Number of files to read ahead of the one being fixed"),
+    make_option('--fsync', dest="fsync", action="store_true", default=False,
+                help="Sync fixed files to disk (in batches) before exiting"),
+    make_option('--max-in-flight', dest="max_in_flight", type="int", default=None,
+                metavar="N", help="Modules handed to the workers at once "
+                                  "(default: twice the number of workers)"),
+    make_option('--max-buffered-bytes', dest="max_buffered_bytes", type="int", default=0,
+                metavar="BYTES", help="Hold back modules while the ones handed to the "
+                                      "workers total this many bytes (0: no limit)"),
+    make_option('--split-messages', dest="split_messages", type="int",
+                default=DEFAULT_SPLIT_MESSAGES, metavar="N",
+                help="Fix a module with at least N messages in regions, on all the "
+                     "workers (0: never)"),
+    make_option('--cache-size', dest="cache_size", type="int", default=10000, metavar="N",
+                help="Number of line fixes memoised per process"),
+    make_option('--fix-cache', dest="fix_cache", default=None, metavar="FILE",
+                help="Keep memoised line fixes in FILE, shared across runs"),
+    make_option('--max-fix-line', dest="max_line", type="int",
+                default=DEFAULT_SETTINGS.max_line, metavar="N",
+                help="Skip messages on lines longer than N characters (0: no limit)"),
+    make_option('--item-timeout', dest="item_timeout", type="float",
+                default=DEFAULT_SETTINGS.item_timeout, metavar="SECONDS",
+                help="Skip a message whose fix takes longer than this (0: no limit)"),
+    make_option('--no-import-graph', dest="import_graph", action="store_false", default=True,
+                help="Fix import messages without consulting the project's import graph"),
+    make_option('--import-cache', dest="import_cache", default=None, metavar="FILE",
+                help="Cache of parsed module imports, keyed by file hash "
+                     "(default: ~/.cache/autopylint/imports.json)"),
+    make_option('--mmap-threshold', dest="mmap_threshold", type="int",
+                default=DEFAULT_SETTINGS.mmap_threshold, metavar="BYTES",
+                help="Memory-map files of at least this size and rewrite only the "
+                     "lines that change (0: never)"),
+    make_option('--timings', dest="timings", default=None, metavar="FILE",
+                help="Keep per-fixer timings in FILE, shared across runs, to schedule "
+                     "the largest modules first"),
+]
+
+# Subcommands, imported only when used
+COMMANDS = {
+    "batch": "src.batch:main",
+    "revert": "src.journal:main",
+    "stats": "src.stats:main",
+    "watch": "src.watch:main",
+}
+
+
+def parse_args(argv):
+    """ Parse the command line into options and report filenames """
+    parser = OptionParser(
+        usage="%prog [options] lintfile [lintfile ...]\n"
+              "       %prog batch [options] manifest\n"
+              "       %prog revert [options] journal\n"
+              "       %prog stats [options] report\n"
+              "       %prog watch [options] path [path ...]",
+        option_list=OPTION_LIST,
+        add_help_option=True
+    )
+    return parser.parse_args(argv)
+
+
+def configure_logging(verbose=False):
+    """
+    Log every message's fix with -v, else at the level named by $LOGCFG (as
+    the sed package does), else at INFO: the counts and summaries of the run
+    """
+    level = "DEBUG" if verbose else os.getenv("LOGCFG", "INFO")
+    # force: main may run more than once in a process (the tests, watch)
+    logging.basicConfig(level=logging.getLevelName(level), force=True)
 
 
-def main():
+def main(argv=None):
     """ Main entry point"""
-    return call_main(StreamEditorAutoPylint)
+    argv = sys.argv[1:] if argv is None else argv
+    configure_logging("-v" in argv or "--verbose" in argv)
+    if argv and argv[0] in COMMANDS:
+        return load(COMMANDS[argv[0]])(argv[1:])
+
+    options, args = parse_args(argv)
+    edit_journal = None
+    if options.journal:
+        from src.journal import Journal
+        edit_journal = Journal(options.journal)
+    status = 0
+    try:
+        for filename in args:
+            try:
+                with StreamEditorAutoPylint(filename, options, edit_journal) as streamed:
+                    streamed.transform()
+                if streamed.errors:
+                    status = 1
+            except IOError:
+                LOGGER.exception("main({0})".format(filename))
+                status = 1
+    finally:
+        if edit_journal:
+            edit_journal.close()
+    from src.scheduler import peak_rss
+
+    rss = peak_rss()
+    if rss:
+        LOGGER.info("Peak RSS: {0:.1f} MB (largest worker {1:.1f} MB)".format(
+            rss[0] / 1e6, rss[1] / 1e6))
+    return status
 
 
 if __name__ == '__main__':
@@ -0,0 +1,214 @@
+"""
+`autopylint batch`: fix the reports of many repositories in one run.
+
+The manifest lists one repository per line, as its root and its pylint report
+(relative paths are relative to the manifest); blank lines and comments are
+ignored:
+
+    repos/service-a  reports/service-a.txt
+    repos/service-b  reports/service-b.txt    # nightly
+
+The modules of every repository are scheduled together, largest first, on a
+single pool of worker processes, so start-up is paid once and the workers'
+line fix and regex caches serve all the repositories. The summary of each
+repository is written as a line of JSON.
+
+    autopylint batch [options] manifest
+"""
+import os
+import sys
+import json
+import time
+import logging
+from optparse import make_option, OptionParser
+
+from src import fix_cache, import_graph
+from src.autopylint import OPTION_LIST, StreamEditorAutoPylint
+from src.pipeline import WriteBehind
+from src.scheduler import WorkQueue
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+# Options of a single run that do not apply to a batch
+SINGLE_RUN_OPTIONS = frozenset(["diff_base", "read_ahead"])
+
+
+def read_manifest(filename):
+    """ The (root, report) pair of each repository listed in a manifest """
+    base = os.path.dirname(os.path.abspath(filename))
+    repos = []
+    with open(filename) as handle:
+        for line_no, line in enumerate(handle, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 2:
+                raise ValueError("{0}:{1}: expected a repository root and a report".format(
+                    filename, line_no))
+            repos.append(tuple(
+                os.path.normpath(os.path.join(base, os.path.expanduser(field)))
+                for field in fields
+            ))
+    return repos
+
+
+def repo_error(run, error):
+    """ Log an error that stops one repository, and record it in its summary """
+    LOGGER.error("{0}: {1}".format(run.root, error))
+    run.errors.append(str(error))
+
+
+def project_graphs(runs):
+    """
+    The import graphs of the repositories, each built by its run only once one
+    of its messages needs it, or None if none of them keeps one
+    """
+    graphs = dict((run.root, run.graph) for run in runs if run.graph is not None)
+    return import_graph.ProjectGraphs(graphs) if graphs else None
+
+
+def round_jobs(pending, owner, later):
+    """
+    The jobs of one round, from the (run, job) pairs of `pending`, noting in
+    `owner` the run each file's job is from. A job for a file that the round
+    already fixes (repositories may overlap) is left in `later` for the next
+    round, so that no two jobs fix, and write, the same file at once.
+    """
+    for run, job in pending:
+        if job[0] in owner:
+            later.append((run, job))
+        else:
+            owner[job[0]] = run
+            yield job
+
+
+def run_batch(repos, options, edit_journal=None):
+    """
+    Fix the reports of the (root, report) `repos` on one shared pool.
+    Returns the StreamEditorAutoPylint of each repository, holding its counts.
+    """
+    runs = [
+        StreamEditorAutoPylint(report, options, edit_journal, root=root)
+        for root, report in repos
+    ]
+    lead = runs[0]
+    # One cost model and list of new line fixes serve every repository
+    for run in runs:
+        run.cost_model = lead.cost_model
+        run.cache_entries = lead.cache_entries
+        run.graph = run.new_import_graph()
+    import_graph.configure(project_graphs(runs))
+
+    def reports():
+        """ The (run, job) pairs of every repository in turn """
+        for run in runs:
+            if run.errors:
+                continue
+            try:
+                for job in run.parse_jobs():
+                    yield run, job
+            except IOError as e:
+                repo_error(run, e)
+
+    pending, errors, peak = reports(), [], 0
+    try:
+        while pending:
+            owner, later = {}, []
+            # A round's files are all written before the next round reads them
+            writer = WriteBehind(fsync=lead.fsync, journal=edit_journal)
+            for run in runs:
+                run.writer = writer
+            queue = WorkQueue(round_jobs(pending, owner, later), lead.cost_model)
+            try:
+                # fix_all only depends on the options, which all the repositories share
+                for result in lead.fix_all(queue):
+                    # A file has one job per round, so the owners of the jobs
+                    # that fail (None) are simply dropped with the round
+                    if result is not None:
+                        owner.pop(result.filename).save_result(result)
+            finally:
+                writer.close()
+                errors.extend(writer.errors)
+            peak = max(peak, queue.peak)
+            pending = later
+    finally:
+        for run in runs:
+            if run.graph is not None:
+                run.graph.close()
+        import_graph.configure(None)
+    for run in runs:
+        prefix = os.path.join(run.root, "")
+        run.write_failed([(filename, error) for filename, error in errors
+                          if filename.startswith(prefix)])
+    LOGGER.info("Work queue: at most {0} modules buffered".format(peak))
+    if lead.timings:
+        lead.cost_model.save(lead.timings)
+    fix_cache.LINE_CACHE.close()
+    fix_cache.save_entries(lead.cache_config[1], lead.cache_entries)
+    return runs
+
+
+def write_summaries(runs, filename=None):
+    """ Write the summary of each repository as a line of JSON, to `filename` or stdout """
+    handle = open(filename, "w") if filename else sys.stdout
+    try:
+        for run in runs:
+            handle.write(json.dumps(run.summary(), sort_keys=True) + "\n")
+    finally:
+        if filename:
+            handle.close()
+
+
+def parse_args(argv):
+    """ Parse the command line of `autopylint batch` """
+    option_list = [option for option in OPTION_LIST if option.dest not in SINGLE_RUN_OPTIONS]
+    option_list.append(
+        make_option('--summary', dest="summary", default=None, metavar="FILE",
+                    help="Write the summary of each repository to FILE as lines of JSON "
+                         "(default: standard output)"),
+    )
+    parser = OptionParser(
+        usage="%prog batch [options] manifest",
+        option_list=option_list,
+        add_help_option=True
+    )
+    options, args = parser.parse_args(argv)
+    if len(args) != 1:
+        parser.error("expected one manifest")
+    return options, args[0]
+
+
+def main(argv):
+    """ Entry point for `autopylint batch` """
+    options, manifest = parse_args(argv)
+    try:
+        repos = read_manifest(manifest)
+    except (IOError, OSError, ValueError) as e:
+        LOGGER.error("autopylint batch: {0}".format(e))
+        return 2
+    if not repos:
+        return 0
+
+    edit_journal = None
+    if options.journal:
+        from src.journal import Journal
+        edit_journal = Journal(options.journal)
+    start = time.time()
+    try:
+        runs = run_batch(repos, options, edit_journal)
+    finally:
+        if edit_journal:
+            edit_journal.close()
+    for run in runs:
+        LOGGER.info("{0}: {1} modules, {2} files saved".format(run.root, run.modules, run.saved))
+        run.log_summary()
+    write_summaries(runs, options.summary)
+    LOGGER.info("Batch: {0} repositories in {1:.1f}s, {2:.1f}s of fixing work".format(
+        len(runs), time.time() - start, sum(run.fix_seconds for run in runs)))
+    return 1 if any(run.errors for run in runs) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""
+Editors over the lines of one module, for the fixers to edit.
+
+They derive from the sed package's StreamEditor, which is slow to import, so
+this module is only imported once there is a module to fix.
+"""
+import os
+
+from sed.engine import StreamEditor
+
+from src.pipeline import encode_lines
+
+
+class DerivedStreamEditor(StreamEditor):
+    """
+    Simple derived class to allow simple stream-editing.
+    """
+    table = [None]
+
+    def __init__(self, filename, options, source=None):
+        self.source = source
+        if source is None:
+            super(DerivedStreamEditor, self).__init__(filename, options)
+            self.deltas = []
+            return
+        # The same state StreamEditor.__init__ sets up, from contents already read
+        self.changes = 0
+        self.verbose = options.verbose
+        self.dryrun = options.dryrun
+        self.new_filename = (
+            None if not options.new_ext
+            else os.path.splitext(filename)[0] + options.new_ext
+        )
+        self.filename = filename
+        self.lines = source.lines
+        self.matches = []
+        self.deltas = []
+
+    def apply_match(self, *_):  # pylint: disable=arguments-differ
+        """ Required method for StreamEditor """
+        pass
+
+    def splice(self, start, end, new_lines):
+        """
+        Replace lines start..end-1 with `new_lines`: what every range method
+        does. The edit is also recorded in `deltas`, so that the text after any
+        number of edits can be rebuilt (see `replay`) without keeping copies.
+        """
+        new_lines = list(new_lines)
+        self.deltas.append((start, end, new_lines))
+        self.lines = self.lines[:start] + new_lines + self.lines[end:]
+        self.changes += 1
+
+    def replace_range(self, loc, new_lines):
+        self.splice(loc[0], loc[1], new_lines)
+
+    def insert_range(self, loc, new_lines):
+        self.splice(loc, loc, new_lines)
+
+    def append_range(self, loc, new_lines):
+        self.splice(loc + 1, loc + 1, new_lines)
+
+    def delete_range(self, loc):
+        self.splice(loc[0], loc[1] + 1, [])
+
+    def snapshot(self):
+        """
+        Capture the editor state. The range methods build a new line list
+        rather than mutating `lines`, so holding a reference is enough.
+        """
+        return (self.lines, self.changes, len(self.deltas))
+
+    def restore(self, state):
+        """ Roll the editor back to a state returned by `snapshot` """
+        self.lines, self.changes, count = state
+        del self.deltas[count:]
+
+    def replay(self, count):
+        """ The lines after the first `count` recorded edits, rebuilt from `original` """
+        lines = list(self.original)
+        for start, end, new_lines in self.deltas[:count]:
+            lines[start:end] = new_lines
+        return lines
+
+    def encode(self):
+        """ The fixed file contents, as StreamEditor.save would write them """
+        return encode_lines(self.lines, self.source.encoding)
+
+    def apply_edits(self, edits):
+        """ Apply sorted, non-overlapping (start, end, new lines) edits in one pass """
+        lines, last = [], 0
+        for start, end, new_lines in edits:
+            lines.extend(self.lines[last:start])
+            lines.extend(new_lines)
+            last = end
+        lines.extend(self.lines[last:])
+        self.lines = lines
+        # Last first, so that each recorded edit applies to the lines before it
+        self.deltas.extend((start, end, list(new_lines)) for start, end, new_lines in reversed(edits))
+
+
+class RegionStreamEditor(DerivedStreamEditor):
+    """
+    Editor over one region of a module. For every line it also tracks the
+    region line it was (None for a new line), so that the fixes can be handed
+    back as edits to the original lines.
+    """
+    def __init__(self, filename, options, source=None):
+        super(RegionStreamEditor, self).__init__(filename, options, source)
+        self.origin = list(range(len(self.lines)))
+
+    def splice(self, start, end, new_lines):
+        new_lines = list(new_lines)
+        self.origin = self.origin[:start] + [None] * len(new_lines) + self.origin[end:]
+        super(RegionStreamEditor, self).splice(start, end, new_lines)
+
+    def snapshot(self):
+        return super(RegionStreamEditor, self).snapshot() + (self.origin, )
+
+    def restore(self, state):
+        super(RegionStreamEditor, self).restore(state[:-1])
+        self.origin = state[-1]
+
+
+class MappedStreamEditor(DerivedStreamEditor):
+    """
+    Editor over a MappedSource: `lines` is a LazyLines, and the range methods
+    record edits in its piece table instead of rebuilding a list of lines.
+    """
+    def splice(self, start, end, new_lines):
+        new_lines = list(new_lines)
+        self.deltas.append((start, end, new_lines))
+        self.lines = self.lines.replace(start, end, new_lines)
+        self.changes += 1
+
+    def encode(self):
+        """ The fixed file contents, spliced from the original bytes """
+        return self.lines.encode()
+
+    def apply_edits(self, edits):
+        self.lines = self.lines.splice(edits)
+        self.deltas.extend((start, end, list(new_lines)) for start, end, new_lines in reversed(edits))
+
+
+class EditorOptions(object):
+    """ Hack: make an object to initialize StreamEditor """
+    def __init__(self):
+        self.verbose = True
+        self.ext = None
+        self.new_ext = None
+        self.dryrun = False
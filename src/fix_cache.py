@@ -0,0 +1,148 @@
+"""
+Memoisation of pure single-line fixers.
+
+A pure line fixer computes the replacement for one line from nothing but
+(error, desc, line text), so its result can be cached and reused wherever the
+same offending line turns up again. Results live in a bounded LRU per process,
+optionally backed by a dbm file shared across runs.
+"""
+import dbm
+import json
+import functools
+from collections import OrderedDict
+
+MISS = object()
+
+# Bumped whenever a pure line fixer changes, to invalidate persistent stores
+CACHE_VERSION = 1
+
+# The key under which a persistent store records its CACHE_VERSION
+VERSION_KEY = b"__version__"
+
+
+def current_version(db):
+    """ Whether the persistent store `db` was written with this CACHE_VERSION """
+    return db.get(VERSION_KEY) == str(CACHE_VERSION).encode("ascii")
+
+
+class LineFixCache(object):
+    """ Bounded LRU of line fixes, with an optional persistent store behind it """
+    def __init__(self, maxsize=10000, store=None):
+        self.maxsize = maxsize
+        self.store = store
+        self.db = None
+        self.store_missing = False
+        self.lru = OrderedDict()
+        self.hits = self.misses = 0
+        self.new_entries = []
+
+    @staticmethod
+    def encode(key):
+        """ Serialise a cache key for the persistent store """
+        return json.dumps(key, separators=(",", ":")).encode("utf-8")
+
+    def _store_get(self, key):
+        if self.db is None:
+            if self.store is None or self.store_missing:
+                return MISS
+            try:
+                self.db = dbm.open(self.store, "r")
+            except dbm.error:
+                # No store yet: it is created when the first results are saved
+                self.store_missing = True
+                return MISS
+            if not current_version(self.db):
+                # Written by other fixers: it is replaced when results are saved
+                self.close()
+                self.store_missing = True
+                return MISS
+        value = self.db.get(self.encode(key))
+        return MISS if value is None else json.loads(value.decode("utf-8"))
+
+    def get(self, key):
+        """ Look up a fix, returning MISS if it is not cached """
+        value = self.lru.get(key, MISS)
+        if value is MISS:
+            value = self._store_get(key)
+            if value is not MISS:
+                self._put(key, value)
+        else:
+            self.lru.move_to_end(key)
+        if value is MISS:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def _put(self, key, value):
+        self.lru[key] = value
+        if len(self.lru) > self.maxsize:
+            self.lru.popitem(last=False)
+
+    def put(self, key, value):
+        """ Cache a newly computed fix """
+        self._put(key, value)
+        if self.store is not None:
+            self.new_entries.append((key, value))
+
+    def take_stats(self):
+        """ Return and reset (hits, misses, new entries) since the last call """
+        stats = (self.hits, self.misses, self.new_entries)
+        self.hits = self.misses = 0
+        self.new_entries = []
+        return stats
+
+    def close(self):
+        """ Close the persistent store, if it was opened """
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+LINE_CACHE = LineFixCache()
+
+
+def configure(maxsize=10000, store=None):
+    """ Set up the cache of this process (also used as a worker initializer) """
+    global LINE_CACHE  # pylint: disable=global-statement
+    LINE_CACHE.close()
+    LINE_CACHE = LineFixCache(maxsize, store)
+
+
+def save_entries(store, entries):
+    """ Add newly computed fixes to the persistent store """
+    if not store or not entries:
+        return
+    db = dbm.open(store, "c")
+    if not current_version(db):
+        db.close()
+        db = dbm.open(store, "n")
+    try:
+        db[VERSION_KEY] = str(CACHE_VERSION)
+        for key, value in entries:
+            db[LineFixCache.encode(key)] = json.dumps(value)
+    finally:
+        db.close()
+
+
+def line_fixer(repair):
+    """
+    Declare `repair(line, item)` a pure line fixer and turn it into an editor
+    fixer. `repair` returns the lines that replace `line`, or None to leave it.
+    """
+    @functools.wraps(repair)
+    def fixer(editor, item):
+        """ Apply the (memoised) repair to the line of the item """
+        line_no = item.line_no
+        line = editor.lines[line_no]
+        key = (repair.__name__, item.error, item.desc, line)
+        new_lines = LINE_CACHE.get(key)
+        if new_lines is MISS:
+            new_lines = repair(line, item)
+            LINE_CACHE.put(key, new_lines)
+        if new_lines is None or new_lines == [line]:
+            return (line_no, 0)
+        editor.replace_range((line_no, line_no + 1), list(new_lines))
+        return (line_no, len(new_lines) - 1)
+    fixer.pure = True
+    return fixer
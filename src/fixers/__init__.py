@@ -0,0 +1,4 @@
+"""
+Built-in fixers. Each module is only imported when a report contains
+one of the error codes it fixes (see src.registry).
+"""
@@ -0,0 +1,88 @@
+"""
+Fixers for errors in expressions and statements
+"""
+import re
+import logging
+
+from src.fix_cache import line_fixer
+from src.fixers.util import find_string
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+
+def superfluous_parens(editor, item):
+    """ Pylint method to fix superfluous_parens error """
+    line_no = item.line_no
+    return (line_no, 0)
+
+
+superfluous_parens.edits = False
+
+
+def invalid_name(editor, item):
+    """ Pylint method to fix invalid_name error """
+    line_no = item.line_no
+    return (line_no, 0)
+
+
+invalid_name.edits = False
+
+
+def misplaced_comparison_constant(editor, item):
+    """ Pylint method to fix misplaced_comparison_constant error """
+    line_no = item.line_no
+    return (line_no, 0)
+
+
+misplaced_comparison_constant.edits = False
+
+
+@line_fixer
+def len_as_condition(error_text, _):
+    """ Pylint method to fix len-as-condition error """
+    zero_cmp = re.compile(r'''
+        ^(?P<left>.*?)
+        len\((?P<len>.*?)\)
+        \s+==\s+0
+        (?P<right>.*)$
+    ''', re.VERBOSE)
+    nzero_cmp = re.compile(r'''
+        ^(?P<left>.*?)
+        len\((?P<len>.*?)\)
+        \s+!=\s+0
+        (?P<right>.*)$
+    ''', re.VERBOSE)
+    result = None
+    for reg, fmt in ((zero_cmp, "{left}not {len}{right}"), (nzero_cmp, "{left}{len}{right}")):
+        match = reg.match(error_text)
+        if match:
+            result = [fmt.format(**match.groupdict())]
+    return result
+
+
+def unused_variable(editor, item):
+    """ Pylint unused-variable method """
+    unused_re = re.compile(r"Unused variable '(?P<unused>.*)'")
+    line_no = item.line_no
+    error_text = editor.lines[line_no]
+    m = unused_re.search(item.desc)
+    unused_var = r"\b{0[unused]}\b".format(m.groupdict())
+    if re.match(r".*except.*as\s+{0}:".format(unused_var), error_text):
+        repaired_line = re.sub(r"\s+as+{0}".format(unused_var), "", error_text)
+    else:
+        repaired_line = re.sub(unused_var, '_', error_text, count=1)
+        loc = (line_no, line_no + 1)
+        editor.replace_range(loc, [repaired_line])
+    return (line_no, 0)
+
+
+@line_fixer
+def anomalous_backslash_in_string(src, _):
+    """ Pylint anomalous-backslash-in-string method """
+    start, end = find_string(src)
+    if (start, end) != (None, None):
+        return [src[:start] + 'r' + src[start:]]
+    LOGGER.debug("Can't find anomalous string: '{0}'".format(src))
+    return None
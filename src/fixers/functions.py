@@ -0,0 +1,126 @@
+"""
+Fixers for errors in function and class definitions
+"""
+import re
+import logging
+
+from src.item import item_assert
+from src.fixers.util import (
+    start_of_function_def,
+    end_of_function_def,
+    end_of_string_doc,
+    get_indent,
+)
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+
+def no_self_use(editor, item):
+    """ Pylint method to fix no_self_use error """
+    line_no = item.line_no
+    LOGGER.debug("no_self_use: {0}".format(line_no))
+    error_text = editor.lines[line_no]
+    LOGGER.debug(error_text)
+    decorator_line_no = start_of_function_def(editor, line_no)
+    indent, _ = get_indent(editor.lines[decorator_line_no])
+    repaired_line = error_text.replace("self, ", "").replace("(self)", "()")
+    editor.replace_range((line_no, line_no + 1), [repaired_line])
+    editor.insert_range(decorator_line_no, ["{0}@staticmethod".format(indent)])
+    return (decorator_line_no, 1)
+
+
+def no_value_for_parameter(editor, item):
+    """ Pylint method to fix no_value_for_parameter error """
+    line_no = item.line_no
+    return (line_no, 0)
+
+
+no_value_for_parameter.edits = False
+
+
+def missing_docstring(editor, item):
+    """ Pylint method to fix missing_docstring error """
+    item_assert(item)
+    line_no = item.line_no
+    error_text = editor.lines[line_no]
+    indent, rest = get_indent(error_text)
+    new_indent = indent + "    "
+
+    if rest.startswith("def "):
+        func = editor.append_range
+        docstring = '{0}""" Pro forma function/method docstring """'.format(new_indent)
+        i = end_of_function_def(editor, line_no)
+    elif rest.startswith("class "):
+        func = editor.append_range
+        docstring = '{0}""" Pro forma class docstring """'.format(new_indent)
+        i = line_no
+    else:
+        # Missing docstring is at module scope
+        func = editor.insert_range
+        docstring = '""" Pro forma module docstring """'
+        i = line_no
+
+    rep = i is not None
+    if rep:
+        func(i, [docstring])
+    return (line_no, int(rep))
+
+
+def unused_argument(editor, item):
+    """ Pylint unused-argument method """
+    line_no = item.line_no
+    error_text = editor.lines[line_no]
+    LOGGER.debug("unused argument: {0}".format(error_text))
+    return (line_no, 0)
+
+
+unused_argument.edits = False
+
+
+def dangerous_default_value(editor, item):
+    """
+    Pylint dangerous-default-value method
+    GIVEN a line that has a mutable default argument
+    THEN change the argument to None and add a line that converts a None argument
+    to the required empty type.
+    """
+    line_no = item.line_no
+    error_text = editor.lines[line_no]
+    regex = r'Dangerous default value (?P<default_arg>.*?) as argument'
+    m = re.match(regex, item.desc)
+    if m:
+        default_arg = m.groupdict()["default_arg"]
+        regex = r'^.*(?P<arg_name>[\w\d_]+)(?P<spacing>\s*=\s*){0}.*$'.format(default_arg)
+        m = re.match(regex, error_text)
+        assert m, "No match on arg_name"
+
+        # Set the variable correctly in the function scope
+        # Skip to the end of the function def
+        # Skip the string doc if present
+        i = end_of_function_def(editor, line_no)
+        if (i is not None) and editor.lines[i + 1].lstrip().startswith(('"""', "'''")):
+            j = end_of_string_doc(editor, i + 1)
+            i = i if j is None else j
+
+        if m and (i is not None):
+            g = m.groupdict()
+            arg_name, spacing = tuple(g[arg] for arg in ("arg_name", "spacing"))
+
+            # Fix the declaration in the function's argument list
+            pattern = arg_name + spacing + default_arg
+            repl = arg_name + "=None"
+            new_decl = error_text.replace(pattern, repl)
+
+            # Assign the default argument if the arg is None
+            # HACK: should not assume that function is indented only 4 spaces
+            spacing = "    "
+            new_assign = "{0}{1} = {1} or {2}".format(spacing, arg_name, default_arg)
+
+            # Perform multiple changes atomically
+            editor.replace_range((line_no, line_no + 1), [new_decl])
+            editor.append_range(i, [new_assign])
+            return (i, 1)
+
+    return (line_no, 0)
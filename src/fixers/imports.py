@@ -0,0 +1,138 @@
+"""
+Fixers for import errors
+"""
+import re
+import logging
+
+from src.action_regex import (
+    STD_IMPORT,
+    FROM_IMP,
+)
+from src import import_graph
+from src.fix_cache import line_fixer
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+RELATIVE_IMPORT = re.compile(
+    r"Relative import '(?P<actual>[\w\d\._]+)', should be '(?P<desired>[\w\d\._]+)'"
+)
+
+
+def unused_import(editor, item):
+    """ Pylint method to fix unused_import error """
+    line_no = item.line_no
+    result = (line_no, 0)
+    error_text = editor.lines[line_no]
+    remove = item.desc.split(' ')[1]
+    graph = import_graph.GRAPH
+    if graph is not None and graph.is_reexported(editor.filename, remove):
+        LOGGER.debug("Keeping {0}: other modules import it from {1}".format(
+            remove, editor.filename))
+        return result
+    m = FROM_IMP.match(error_text)
+    if m:
+        groups = m.groupdict()
+        library = groups["library"]
+        imports = [imp.strip() for imp in groups["imports"].split(',')]
+        LOGGER.debug("imports: {0}".format(imports))
+        LOGGER.debug("remove: {0}".format(remove))
+        final_imports = set(imports) - set([remove])
+        LOGGER.debug("{0}: {1}".format(library, ", ".join(final_imports) or "<empty>"))
+        if not final_imports:
+            # With the import removed, the line has no operative imports -- remove line
+            loc = (line_no, line_no)
+            LOGGER.debug("deleting: {0}".format(loc))
+            LOGGER.debug("0 <= {0} <= {1} <= {2}".format(loc[0], loc[1], len(editor.lines)))
+            editor.delete_range(loc)
+            result = (line_no + 1, -1)
+        else:
+            # Format a new line with the unused removed and the remaining imports sorted
+            repaired_line = "from {0} import {1}".format(
+                library,
+                ", ".join(sorted(final_imports))
+            )
+            loc = (line_no, line_no + 1)
+            editor.replace_range(loc, [repaired_line])
+    return result
+
+
+def ungrouped_imports(editor, item):
+    """ Pylint ungrouped-imports method """
+    line_no = item.line_no
+    return (line_no, 0)
+
+
+ungrouped_imports.edits = False
+
+
+def wrong_import_order(editor, item):
+    """ Pylint wrong_import_order method """
+    line_no = item.line_no
+    m = STD_IMPORT.match(item.desc)
+    if m:
+        g = m.groupdict()
+        before, after = (
+            re.compile("^{0}$".format(g[key]))
+            for key in ("before", "after")
+        )
+        before_matches = list(editor.find_line(before))
+        after_matches = list(editor.find_line(after))
+        if len(before_matches) == 1 and len(after_matches) == 1:
+            i, _ = before_matches[0]
+            j, _ = after_matches[0]
+            if i > j:
+                # This case would not be true if a previous item
+                # caused the order to be altered.
+                line_nos = [i] + list(range(j + 1, i)) + [j]
+                new_lines = [editor.lines[x] for x in line_nos]
+                loc = (j, i + 1)
+                assert len(new_lines) == (i + 1 - j)
+                count_before = len(editor.lines)
+                editor.replace_range(loc, new_lines)
+                count_after = len(editor.lines)
+                assert count_before == count_after
+            else:
+                LOGGER.debug("Wrong import ordering already fixed")
+    return (line_no, 0)
+
+
+# It searches the whole file for the imports, so it is not run on a region of it
+wrong_import_order.whole_file = True
+
+
+def relative_import(editor, item):
+    """
+    Pylint relative-import method
+    GIVEN a line that has a relative import in error
+    THEN change the line to have a correct relative import
+    Where the project's import graph is known, it decides what the import
+    resolves to; an import of a module outside the project is left alone.
+    """
+    graph = import_graph.GRAPH
+    m = RELATIVE_IMPORT.match(item.desc)
+    if graph is not None and m:
+        desired = graph.absolute(editor.filename, m.group("actual"))
+        if desired is None:
+            LOGGER.debug("Keeping relative import {0}: not a module of the project".format(
+                m.group("actual")))
+            return (item.line_no, 0)
+        if desired != m.group("desired"):
+            item = item._replace(desc="Relative import '{0}', should be '{1}'".format(
+                m.group("actual"), desired))
+    return rewrite_relative_import(editor, item)
+
+
+@line_fixer
+def rewrite_relative_import(error_text, item):
+    """ Rewrite the relative import named by a relative-import message as absolute """
+    m = RELATIVE_IMPORT.match(item.desc)
+    if m:
+        g = m.groupdict()
+        actual, desired = g["actual"], g["desired"]
+        regex = r"^(.*?){0}".format(actual)
+        repl = r"\1{0}".format(desired)
+        return [re.sub(regex, repl, error_text)]
+    LOGGER.debug("No match on regex in relative_import")
+    return None
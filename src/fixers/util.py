@@ -0,0 +1,48 @@
+"""
+Helpers shared by the fixers for finding their way around the source
+"""
+import re
+
+
+def start_of_function_def(editor, start_line):
+    """ Find where a function starts, beginning with `start_line` and working backward """
+    for i in reversed(range(start_line + 1)):
+        if editor.lines[i].lstrip().startswith("def "):
+            return i
+    return None
+
+
+def end_of_function_def(editor, start_line):
+    """ Find where a function ends, beginning with `start_line` and working forward """
+    for i in range(start_line, len(editor.lines)):
+        if editor.lines[i].endswith("):"):
+            return i
+    return None
+
+
+def end_of_string_doc(editor, start_line):
+    """ Find where a docstring ends, beginning with `start_line` and working forward """
+    for i in range(start_line, len(editor.lines)):
+        if editor.lines[i].endswith(('"""', "'''")):
+            return i
+    return None
+
+
+def get_indent(src):
+    """ Helper function to get the leading whitespace from a line """
+    match = re.match(r"^(\s*)(.*)$", src)
+    return match.group(1), match.group(2)
+
+
+def find_string(s):
+    """ Find start and end of a quoted string """
+    result = next((i, c) for i, c in enumerate(s) if c in ('"', "'"))
+    if result is not None:
+        start, quote_char = result
+        end = next(
+            i for i, c in enumerate(s[start + 1: ])
+            if c == quote_char and s[i - 1] != '\\'
+        )
+        if end is not None:
+            return (start, start + end + 1)
+    return None, None
@@ -0,0 +1,179 @@
+"""
+Fixers for whitespace, indentation and line-length errors
+"""
+import re
+import logging
+from collections import Counter
+
+from src.action_regex import (
+    IF_STMT_OR,
+    IF_STMT_AND,
+    CONTINUATION,
+    HANGING,
+)
+from src.repair_regex import WHITESPACE_TABLE
+from src.fix_cache import line_fixer
+from src.fixers.util import get_indent
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+
+@line_fixer
+def bad_whitespace(error_text, item):
+    """ Pylint method to fix bad-whitespace error """
+    repaired_line = None
+    x = WHITESPACE_TABLE.get(item.desc)
+    if x:
+        repaired_line = error_text
+        for regex, repl, kwargs in x:
+            r = re.compile(regex)
+            m = r.search(repaired_line)
+            if not m:
+                LOGGER.debug("No match: {0} | {1}".format(regex, repaired_line))
+            repaired_line = re.sub(regex, repl, repaired_line, **kwargs)
+
+        # Sometimes, these fixes add trailing whitespace to lines
+        repaired_line = repaired_line.rstrip()
+
+        if error_text == repaired_line:
+            LOGGER.debug("Bad whitespace repair: {0}".format(repaired_line))
+            LOGGER.debug("Repair: {0}".format(item.desc))
+            LOGGER.debug("regex applied: {0}".format(x))
+    else:
+        LOGGER.debug("No match on '{0}'".format(item.desc))
+
+    return None if repaired_line is None else [repaired_line]
+
+
+def bad_continuation(editor, item):
+    """ Pylint method to fix bad-continuation error """
+    line_no = item.line_no
+    error_text = editor.lines[line_no]
+    m = CONTINUATION.match(item.desc) or HANGING.match(item.desc)
+    if m:
+        g = m.groupdict()
+        verb, count = g.get("verb"), int(g.get("count"))
+        if verb:
+            repaired_line = (
+                error_text[count:] if verb == "remove" else
+                (" " * count) + error_text if verb == "add" else
+                None
+            )
+            if repaired_line is not None:
+                editor.replace_range((line_no, line_no + 1), [repaired_line])
+        else:
+            LOGGER.debug("Missing verb in 'bad_continuation': {0}".format(item.desc))
+    else:
+        LOGGER.debug("No match {1}: {0}".format(error_text, line_no))
+    return (line_no, 0)
+
+
+def trailing_newline(editor, item):
+    """ Pylint method to fix trailing-newline error """
+    line_no = item.line_no
+    loc = (
+        next(
+            x for x in reversed(range(line_no, len(editor.lines)))
+            if not re.match(r'^\s*$', editor.lines[x])
+        ) or line_no,
+        len(editor.lines)
+    )
+    editor.delete_range(loc)
+    return (line_no, loc[1] - loc[0])
+
+
+def trailing_whitespace(editor, item):
+    """
+    Pylint method to fix trailing-whitespace error.
+    The editor's lines are already stripped, so the whitespace is only in the
+    file: record the edit, or the file would not be rewritten. Memory-mapped
+    lines know whether their bytes are padded, and only those are replaced.
+    """
+    line_no = item.line_no
+    padded = getattr(editor.lines, "padded", None)
+    if padded is not None and not padded(line_no):
+        return (line_no, 0)
+    editor.replace_range((line_no, line_no + 1), [editor.lines[line_no].rstrip()])
+    return (line_no, 0)
+
+
+def line_split(s, length):
+    """ Helper method to split lines """
+    def get_counts(s, k):
+        """ Calculate indexes where character is 'k' """
+        return [i for i, c in enumerate(s) if c == k]
+
+    #def remove_negative_counts(counts):
+    #    """ Filter the Counter to remove items with non+ counts """
+    #    return Counter({k: v for k, v in counts.items() if v > 0})
+
+    if len(s) <= length:
+        result = [s]
+    elif s.lstrip().startswith("#"):
+        # Hard/annoying to split a long comment
+        result = [s]
+    elif re.match(r"^.*?#.*$", s):
+        ind0, non_indent = get_indent(s)
+        i = non_indent.index('#')
+        non_comment, comment = non_indent[:i].rstrip(), non_indent[i:]
+        if all(len(ind0 + part) < length
+               for part in (comment, non_comment)):
+            result = [
+                ind0 + comment,
+                ind0 + non_comment,
+            ]
+        else:
+            result = None
+    else:
+        ind0, non_indent = get_indent(s)
+        ind1 = ind0 + 2 * "    "
+        m1 = IF_STMT_OR.match(non_indent)
+        m2 = IF_STMT_AND.match(non_indent)
+        if m1 or m2:
+            g, conj = (
+                (m1.groupdict(), " or") if m1 else
+                (m2.groupdict(), " and")
+            )
+            result = [
+                ind0 + "if (",
+                ind1 + g["first"] + conj,
+                ind1 + g["second"],
+                ind0 + "):"
+            ]
+        else:
+            counts = Counter({
+                k: get_counts(s, k)
+                for k in """()[]{}"'"""
+            })
+            # counts = remove_negative_counts(counts)
+
+            cv = [a for a in counts.values() if a]
+            if cv:
+                mi, ma = min(a[0] for a in cv), max(a[-1] for a in cv)
+                pair = s[mi] + s[ma]
+                if pair in {'()', '{}', '[]'}:
+                    result = [
+                        s[:mi + 1],
+                        ind1 + s[mi + 1:ma],
+                        ind0 + s[ma:]
+                    ]
+                else:
+                    result = None
+            else:
+                LOGGER.debug("Weird: {0}".format(counts))
+                result = None
+    return result
+
+
+@line_fixer
+def line_too_long(error_text, _):
+    """ Pylint line-too-long method """
+    new_lines = line_split(error_text, 100)
+    if not new_lines:
+        LOGGER.debug("Could not split: {0}".format(error_text))
+        return None
+    assert isinstance(new_lines, list), new_lines
+    assert all(isinstance(s, str) for s in new_lines)
+    return new_lines
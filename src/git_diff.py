@@ -0,0 +1,80 @@
+"""
+Changed-line index built from `git diff` output
+"""
+import re
+import subprocess
+from bisect import bisect_right
+
+
+DIFF_FILE = re.compile(r"""
+    ^\+\+\+\s
+    (?:b/)?
+    (?P<filename>.+?)
+    \s*$
+""", re.VERBOSE)
+
+# @@ -12,3 +12,4 @@ def foo():
+DIFF_HUNK = re.compile(r"""
+    ^@@\s
+    -\d+(?:,\d+)?
+    \s
+    \+(?P<start>\d+)(?:,(?P<count>\d+))?
+    \s@@
+""", re.VERBOSE)
+
+
+class IntervalIndex(object):
+    """ Sorted, merged set of closed line ranges with O(log n) lookup """
+    def __init__(self, ranges):
+        self.starts, self.ends = [], []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, line_no):
+        i = bisect_right(self.starts, line_no) - 1
+        return i >= 0 and line_no <= self.ends[i]
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return "IntervalIndex({0})".format(list(zip(self.starts, self.ends)))
+
+
+def hunk_ranges(diff_lines):
+    """
+    Collect the added/changed line ranges (1-based, inclusive) of the new
+    side of a unified diff, keyed by filename
+    """
+    ranges = {}
+    filename = None
+    for line in diff_lines:
+        m = DIFF_FILE.match(line)
+        if m:
+            filename = m.group("filename")
+            filename = None if filename == "/dev/null" else filename
+            continue
+        m = DIFF_HUNK.match(line)
+        if m and filename:
+            start = int(m.group("start"))
+            count = int(m.group("count") or 1)
+            if count:
+                ranges.setdefault(filename, []).append((start, start + count - 1))
+    return ranges
+
+
+def changed_lines(rev):
+    """
+    Run `git diff` against `rev` and index the changed lines of each file.
+    Paths are relative to the current directory, like module paths in the report.
+    """
+    cmd = ["git", "diff", "--no-color", "--no-ext-diff", "--relative", "-U0", rev, "--"]
+    output = subprocess.check_output(cmd, universal_newlines=True)
+    return {
+        filename: IntervalIndex(ranges)
+        for filename, ranges in hunk_ranges(output.splitlines()).items()
+    }
@@ -0,0 +1,40 @@
+"""
+Bound the time spent on a single line, so that one pathological line
+(for instance a regex backtracking on a huge data literal) cannot stall a run.
+"""
+import signal
+import threading
+from contextlib import contextmanager
+
+
+class LineTimeout(Exception):
+    """ Work on a single line took longer than allowed """
+    pass
+
+
+def _main_thread():
+    return threading.current_thread() is threading.main_thread()
+
+
+@contextmanager
+def time_limit(seconds):
+    """
+    Raise LineTimeout inside the block if it runs for more than `seconds`.
+    Uses SIGALRM, so it is only enforced in the main thread of a process on
+    platforms that have it; elsewhere, and when `seconds` is falsy, it does nothing.
+    """
+    if not seconds or not hasattr(signal, "setitimer") or not _main_thread():
+        yield
+        return
+
+    def timeout(*_):
+        """ SIGALRM handler """
+        raise LineTimeout("took longer than {0}s".format(seconds))
+
+    previous = signal.signal(signal.SIGALRM, timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
@@ -0,0 +1,362 @@
+"""
+Project-wide import graph, used by the import fixers to avoid unsafe edits.
+
+Every module under the project root is summarised from its `ast` (what it
+imports, which dotted names it uses and its `__all__`), in parallel, and the
+summaries are cached on disk by file hash so that a later run only re-parses
+the files that changed. The graph built from them answers, in constant time
+per message, whether a name is re-exported by a module and what an implicit
+relative import resolves to.
+"""
+import os
+import ast
+import json
+import pickle
+import hashlib
+import logging
+import tempfile
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_GRAPH_CACHE = os.path.join(
+    os.path.expanduser("~"), ".cache", "autopylint", "imports.json")
+
+# Bumped whenever the summary format changes, to invalidate old caches
+CACHE_VERSION = 1
+
+SKIP_DIRS = frozenset(["__pycache__", "node_modules", "site-packages", "build", "dist"])
+
+# The graph of this process, set by configure() (also used by the worker initializer)
+GRAPH = None
+
+
+def configure(graph):
+    """ Set the import graph the fixers of this process consult """
+    global GRAPH  # pylint: disable=global-statement
+    GRAPH = graph
+
+
+def find_modules(root="."):
+    """ Yield the python files under `root`, skipping hidden and build directories """
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if not d.startswith(".") and d not in SKIP_DIRS and not d.endswith(".egg-info")
+        )
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                yield os.path.join(dirpath, filename)
+
+
+def module_name(filename, root="."):
+    """ Dotted module name of `filename`, relative to the project root """
+    path = os.path.relpath(os.path.abspath(filename), os.path.abspath(root))
+    parts = os.path.splitext(path)[0].split(os.sep)
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def dotted(node):
+    """ "a.b.c" for an attribute chain rooted at a name, else None """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return ".".join(reversed(parts))
+
+
+def string_values(node):
+    """ The string elements of a list or tuple literal """
+    values = []
+    for elt in getattr(node, "elts", []):
+        value = getattr(elt, "value", getattr(elt, "s", None))
+        if isinstance(value, str):
+            values.append(value)
+    return values
+
+
+def summarise(data, filename="<unknown>"):
+    """
+    Summarise a module's source as a JSON-able dict:
+      imports: [kind, module, name, asname, level] for every import statement
+      attrs:   the dotted attribute chains it uses, e.g. "os.path.join"
+      all:     the names listed in __all__, or None
+    """
+    tree = ast.parse(data, filename)
+    imports, attrs, exported = [], set(), None
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.append(["import", alias.name, None, alias.asname, 0])
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                imports.append(["from", node.module or "", alias.name, alias.asname, node.level])
+        elif isinstance(node, ast.Attribute):
+            chain = dotted(node)
+            if chain:
+                attrs.add(chain)
+    for node in tree.body:
+        targets = getattr(node, "targets", None) or [getattr(node, "target", None)]
+        if any(isinstance(t, ast.Name) and t.id == "__all__" for t in targets):
+            exported = (exported or []) + string_values(node.value)
+    return {"imports": imports, "attrs": sorted(attrs), "all": exported}
+
+
+def scan_file(filename, known_hash=None):
+    """
+    Hash a module and summarise it, unless its hash is `known_hash`.
+    Returns (hash, summary); the summary is None if it was not (or could not be) parsed.
+    """
+    try:
+        with open(filename, "rb") as handle:
+            data = handle.read()
+    except (IOError, OSError):
+        return None, None
+    file_hash = hashlib.sha1(data).hexdigest()
+    if file_hash == known_hash:
+        return file_hash, None
+    try:
+        return file_hash, summarise(data, filename)
+    except (SyntaxError, ValueError):
+        LOGGER.debug("Import graph: cannot parse {0}".format(filename))
+        return file_hash, None
+
+
+class ImportGraph(object):
+    """
+    Who imports what across the project, indexed for constant-time queries.
+    `summaries` maps each module's filename to its summary (see summarise).
+    """
+    def __init__(self, summaries, root="."):
+        self.root = root
+        self.names = {}
+        self.exported = {}
+        self.modules = set()
+        # (module, name) pairs that some module of the project takes from `module`
+        self.importers = set()
+        for filename, summary in summaries.items():
+            key = os.path.abspath(filename)
+            self.names[key] = module_name(filename, root)
+            self.modules.add(self.names[key])
+            if summary and summary["all"] is not None:
+                self.exported[key] = frozenset(summary["all"])
+        for filename, summary in summaries.items():
+            if summary:
+                self._add_uses(self.names[os.path.abspath(filename)], filename, summary)
+
+    def _add_uses(self, name, filename, summary):
+        package = name if filename.endswith("__init__.py") else name.rpartition(".")[0]
+        bound = {}
+        for kind, module, imported, asname, level in summary["imports"]:
+            if kind == "from":
+                target = self.resolve(package, module, level)
+                if target is not None:
+                    self.importers.add((target, imported))
+            else:
+                target = self.resolve(package, module, 0)
+                if target is not None:
+                    bound[asname or target] = target
+        # `import pkg` followed by `pkg.name` uses `name` from pkg, too
+        for chain in summary["attrs"]:
+            parts = chain.split(".")
+            for i in range(1, len(parts)):
+                target = bound.get(".".join(parts[:i]))
+                if target is not None:
+                    self.importers.add((target, parts[i]))
+
+    def resolve(self, package, module, level=0):
+        """
+        The project module that `from <level dots><module> import ...` names when
+        written in `package`, or None if it is not part of the project.
+        Implicit relative imports (Python 2) are tried before absolute ones.
+        """
+        if level:
+            base = package.split(".") if package else []
+            if level - 1 > len(base):
+                return None
+            base = base[:len(base) - (level - 1)]
+            target = ".".join(base + ([module] if module else []))
+            return target if target in self.modules else None
+        if package and "{0}.{1}".format(package, module) in self.modules:
+            return "{0}.{1}".format(package, module)
+        return module if module in self.modules else None
+
+    def absolute(self, filename, module):
+        """ The absolute name of the project module an implicit relative import in `filename` means """
+        name = self.names.get(os.path.abspath(filename))
+        if name is None:
+            return None
+        package = name if filename.endswith("__init__.py") else name.rpartition(".")[0]
+        if not package:
+            return None
+        target = "{0}.{1}".format(package, module)
+        return target if target in self.modules else None
+
+    def is_reexported(self, filename, name):
+        """
+        Whether another module relies on `filename` providing `name`: it is listed
+        in __all__, imported from the module, or reached as an attribute of it.
+        """
+        key = os.path.abspath(filename)
+        if name in self.exported.get(key, ()):
+            return True
+        module = self.names.get(key)
+        if module is None:
+            return False
+        return ((module, name) in self.importers or
+                (not name.startswith("_") and (module, "*") in self.importers))
+
+
+class ProjectGraphs(object):
+    """
+    The import graphs of several projects, answering each query from the graph
+    of the project the file belongs to. `graphs` maps project roots to graphs.
+    """
+    def __init__(self, graphs):
+        self.graphs = dict(
+            (os.path.join(os.path.abspath(root), ""), graph) for root, graph in graphs.items()
+        )
+        # Longest root first, so that nested projects win
+        self.roots = sorted(self.graphs, key=len, reverse=True)
+
+    def graph(self, filename):
+        """ The graph of the project holding `filename`, or None """
+        path = os.path.abspath(filename)
+        for root in self.roots:
+            if path.startswith(root):
+                return self.graphs[root]
+        return None
+
+    def absolute(self, filename, module):
+        """ See ImportGraph.absolute """
+        graph = self.graph(filename)
+        return graph.absolute(filename, module) if graph is not None else None
+
+    def is_reexported(self, filename, name):
+        """ See ImportGraph.is_reexported """
+        graph = self.graph(filename)
+        return graph is not None and graph.is_reexported(filename, name)
+
+
+def project_cache(root, cache=DEFAULT_GRAPH_CACHE):
+    """ A cache file of its own for the project under `root`, next to `cache` """
+    key = hashlib.sha1(os.path.abspath(root).encode("utf-8")).hexdigest()[:16]
+    name, ext = os.path.splitext(cache)
+    return "{0}-{1}{2}".format(name, key, ext)
+
+
+def load_cache(cache):
+    """ {filename: [hash, summary]} from an earlier run """
+    try:
+        with open(cache) as handle:
+            cached = json.load(handle)
+        if cached.get("version") == CACHE_VERSION:
+            return cached["files"]
+    except (IOError, OSError, ValueError, KeyError, AttributeError):
+        pass
+    return {}
+
+
+def save_cache(cache, files):
+    """ Store {filename: [hash, summary]} for the next run """
+    try:
+        dirname = os.path.dirname(cache)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        with open(cache, "w") as handle:
+            json.dump({"version": CACHE_VERSION, "files": files}, handle)
+    except (IOError, OSError):
+        LOGGER.debug("Could not write import graph cache {0}".format(cache))
+
+
+def build(root=".", workers=1, cache=None, executor=None):
+    """
+    Build the ImportGraph of the project under `root`, re-parsing only the
+    files whose hash is not in `cache`, on `workers` processes (or on the
+    processes of `executor`, if one is given).
+    """
+    filenames = list(find_modules(root))
+    cached = load_cache(cache) if cache else {}
+    keys = [os.path.abspath(filename) for filename in filenames]
+    known = [cached.get(key, [None])[0] for key in keys]
+
+    if executor is not None:
+        scanned = list(executor.map(scan_file, filenames, known, chunksize=16))
+    elif workers > 1 and len(filenames) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(workers) as executor:
+            scanned = list(executor.map(scan_file, filenames, known, chunksize=16))
+    else:
+        scanned = [scan_file(filename, file_hash) for filename, file_hash in zip(filenames, known)]
+
+    files, summaries, parsed = {}, {}, 0
+    for filename, key, (file_hash, summary) in zip(filenames, keys, scanned):
+        if file_hash is None:
+            continue
+        if summary is None and file_hash == cached.get(key, [None])[0]:
+            summary = cached[key][1]
+        else:
+            parsed += 1
+        files[key] = [file_hash, summary]
+        summaries[filename] = summary
+    LOGGER.info("Import graph: {0} modules, {1} parsed".format(len(summaries), parsed))
+    if cache and parsed:
+        save_cache(cache, files)
+    return ImportGraph(summaries, root)
+
+
+class SavedGraph(object):
+    """
+    The ImportGraph of the project under `root`, built only once a message
+    needs it (see ensure), so the report is read once and the graph may be
+    built after the worker processes have started. The workers get this
+    object in advance: ensure() saves the graph to `filename`, and a worker
+    loads it from there the first time it is queried.
+    """
+    def __init__(self, root=".", cache=None, workers=1):
+        self.root = root
+        self.cache = cache
+        self.workers = workers
+        self.graph = None
+        handle, self.filename = tempfile.mkstemp(prefix="autopylint-", suffix=".graph")
+        os.close(handle)
+
+    def __getstate__(self):
+        # A worker loads the graph from the file rather than being sent it
+        return dict(self.__dict__, graph=None)
+
+    def ensure(self):
+        """ Build and save the graph, unless that is done already """
+        if self.graph is None:
+            self.graph = build(self.root, self.workers, self.cache)
+            with open(self.filename, "wb") as handle:
+                pickle.dump(self.graph, handle, pickle.HIGHEST_PROTOCOL)
+        return self.graph
+
+    def get(self):
+        """ The graph, loaded from the saved file the first time in a worker """
+        if self.graph is None:
+            with open(self.filename, "rb") as handle:
+                self.graph = pickle.load(handle)
+        return self.graph
+
+    def close(self):
+        """ Remove the saved graph """
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
+
+    def absolute(self, filename, module):
+        """ See ImportGraph.absolute """
+        return self.get().absolute(filename, module)
+
+    def is_reexported(self, filename, name):
+        """ See ImportGraph.is_reexported """
+        return self.get().is_reexported(filename, name)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+Import-time benchmark for autopylint's cold start, based on `python -X importtime`.
+
+    python -m src.import_time [-n TOP] [module]
+"""
+from __future__ import print_function
+
+import os
+import re
+import sys
+import subprocess
+from optparse import make_option, OptionParser
+
+
+IMPORT_TIME = re.compile(r"""
+    ^import\stime:\s+
+    (?P<self>\d+)\s+\|\s+
+    (?P<cumulative>\d+)\s+\|\s
+    (?P<name>.+)
+    $
+""", re.VERBOSE)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module="src.autopylint"):
+    """
+    Import `module` in a fresh interpreter and return {module name: (self us,
+    cumulative us)} for every module that the import loaded
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", "import {0}".format(module)]
+    proc = subprocess.Popen(
+        cmd, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    _, err = proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(err)
+    times = {}
+    for line in err.splitlines():
+        m = IMPORT_TIME.match(line)
+        if m:
+            times[m.group("name").strip()] = (int(m.group("self")), int(m.group("cumulative")))
+    return times
+
+
+def main(argv=None):
+    """ Print the total import time of a module and its most expensive imports """
+    option_list = [
+        make_option('-n', '--top', dest="top", type="int", default=15,
+                    help="Number of most expensive imports to list"),
+    ]
+    parser = OptionParser(usage="%prog [options] [module]", option_list=option_list)
+    options, args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    module = args[0] if args else "src.autopylint"
+
+    times = import_times(module)
+    print("{0}: {1} modules, {2:.1f} ms cumulative".format(
+        module, len(times), times[module][1] / 1000.0))
+    for name, (self_us, cumulative) in sorted(
+            times.items(), key=lambda kv: kv[1][0], reverse=True)[:options.top]:
+        print("{0:>9.2f} ms self {1:>9.2f} ms cumulative  {2}".format(
+            self_us / 1000.0, cumulative / 1000.0, name))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
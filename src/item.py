@@ -0,0 +1,20 @@
+"""
+The Item record for one pylint message
+"""
+from collections import namedtuple
+
+
+Item = namedtuple("Item", ["type", "line_no", "line_offset", "desc", "error"])
+
+
+def item_assert(item):
+    """ Assert that Item is correctly constructed """
+    assert isinstance(item.type, str)
+    assert isinstance(item.desc, str)
+    assert isinstance(item.error, str)
+    assert isinstance(item.line_no, int)
+    assert isinstance(item.line_offset, int)
+    assert item.desc
+    assert item.type
+    assert item.error
+
@@ -0,0 +1,195 @@
+"""
+Compact journal of the edits made in a run, and the revert command that undoes them.
+
+A journal is a JSON-lines file. The first line is a header; every other line
+holds, for one saved file, the hashes of its contents before and after the
+run and the line-level patches that turn the new contents back into the old.
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+from bisect import bisect_left
+from optparse import make_option, OptionParser
+from concurrent.futures import ThreadPoolExecutor
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+
+def digest(data):
+    """ Content hash used to check a file before and after reverting it """
+    return hashlib.sha1(data).hexdigest()
+
+
+def split_lines(data):
+    """ Split raw file contents into lines, keeping line endings, as text that round-trips """
+    return data.decode("utf-8", "surrogateescape").splitlines(True)
+
+
+def join_lines(lines):
+    """ Inverse of `split_lines` """
+    return "".join(lines).encode("utf-8", "surrogateescape")
+
+
+def unique_anchors(old, new):
+    """
+    The (i, j) pairs of lines that occur exactly once in `new` (at i) and once
+    in `old` (at j), longest run increasing in both: the fixed points of a
+    patience diff, found in O(n log n) whatever the file looks like.
+    """
+    counts = {}
+    for j, line in enumerate(old):
+        counts[line] = (counts[line][0] + 1, j) if line in counts else (1, j)
+    seen = {}
+    for i, line in enumerate(new):
+        seen[line] = (seen[line][0] + 1, i) if line in seen else (1, i)
+    pairs = sorted(
+        (i, counts[line][1]) for line, (n, i) in seen.items()
+        if n == 1 and counts.get(line, (0, ))[0] == 1
+    )
+    # Longest increasing subsequence of j, by patience sorting
+    tops, top_js, links = [], [], []
+    for k, (_, j) in enumerate(pairs):
+        pile = bisect_left(top_js, j)
+        links.append(tops[pile - 1] if pile else None)
+        if pile == len(tops):
+            tops.append(k)
+            top_js.append(j)
+        else:
+            tops[pile], top_js[pile] = k, j
+    anchors = []
+    k = tops[-1] if tops else None
+    while k is not None:
+        anchors.append(pairs[k])
+        k = links[k]
+    return anchors[::-1]
+
+
+def reverse_patches(before, after):
+    """
+    Compute the patches that turn the lines `after` back into `before`, as a list
+    of (start, end, lines) meaning: replace after[start:end] with lines.
+    Lines between the anchors of `unique_anchors` that differ are replaced as
+    one hunk, so the cost stays close to linear even on repetitive files.
+    """
+    patches = []
+    i0 = j0 = 0
+    for i, j in unique_anchors(before, after) + [(len(after), len(before))]:
+        # Trim the common head and tail of the region between two anchors
+        while i0 < i and j0 < j and after[i0] == before[j0]:
+            i0, j0 = i0 + 1, j0 + 1
+        i1, j1 = i, j
+        while i1 > i0 and j1 > j0 and after[i1 - 1] == before[j1 - 1]:
+            i1, j1 = i1 - 1, j1 - 1
+        if i0 < i1 or j0 < j1:
+            patches.append((i0, i1, before[j0:j1]))
+        i0, j0 = i + 1, j + 1
+    return patches
+
+
+def apply_patches(lines, patches):
+    """ Apply patches from `reverse_patches`, last first so offsets stay valid """
+    lines = list(lines)
+    for start, end, new_lines in reversed(patches):
+        lines[start:end] = new_lines
+    return lines
+
+
+class Journal(object):
+    """ Writer for the edit journal of one run """
+    def __init__(self, filename):
+        self.filename = filename
+        self.count = 0
+        self.handle = open(filename, "w")
+        self._write({"version": JOURNAL_VERSION, "created": time.time(), "cwd": os.getcwd()})
+
+    def _write(self, record):
+        self.handle.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record(self, filename, before, after):
+        """ Journal the change of `filename` from raw contents `before` to `after` """
+        if before == after:
+            return
+        self._write({
+            "filename": os.path.abspath(filename),
+            "before": digest(before),
+            "after": digest(after),
+            "patches": reverse_patches(split_lines(before), split_lines(after)),
+        })
+        self.count += 1
+
+    def close(self):
+        """ Flush the journal to disk """
+        self.handle.flush()
+        os.fsync(self.handle.fileno())
+        self.handle.close()
+        LOGGER.info("Journaled {0} files in {1}".format(self.count, self.filename))
+
+
+def read_journal(filename):
+    """ Read the file records of a journal, grouped by file in journal order """
+    records = {}
+    with open(filename) as handle:
+        header = json.loads(next(handle))
+        if header.get("version") != JOURNAL_VERSION:
+            raise ValueError("Unsupported journal version: {0}".format(header.get("version")))
+        for line in handle:
+            record = json.loads(line)
+            records.setdefault(record["filename"], []).append(record)
+    return records
+
+
+def revert_file(filename, records):
+    """
+    Undo the journaled changes of one file, newest first. The file is only
+    written if it is exactly as the run left it.
+    """
+    with open(filename, "rb") as handle:
+        data = handle.read()
+    for record in reversed(records):
+        if digest(data) != record["after"]:
+            LOGGER.error("Not reverting {0}: it has changed since it was fixed".format(filename))
+            return False
+        data = join_lines(apply_patches(split_lines(data), record["patches"]))
+        if digest(data) != record["before"]:
+            LOGGER.error("Not reverting {0}: journal does not restore it".format(filename))
+            return False
+    with open(filename, "wb") as handle:
+        handle.write(data)
+    LOGGER.info("Reverted {0}".format(filename))
+    return True
+
+
+def revert(journal_filename, workers=None):
+    """ Restore every file in the journal, in parallel; return the number that failed """
+    records = read_journal(journal_filename)
+    with ThreadPoolExecutor(workers or min(32, (os.cpu_count() or 1) + 4)) as executor:
+        results = list(executor.map(revert_file, records.keys(), records.values()))
+    return results.count(False)
+
+
+def main(argv):
+    """ Entry point for `autopylint revert` """
+    option_list = [
+        make_option('-j', '--jobs', dest="jobs", type="int", default=None,
+                    help="Number of files to restore concurrently"),
+    ]
+    parser = OptionParser(
+        usage="%prog revert [options] journal",
+        option_list=option_list,
+        add_help_option=True
+    )
+    options, args = parser.parse_args(argv)
+    if len(args) != 1:
+        parser.error("expected one journal file")
+    return 1 if revert(args[0], options.jobs) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,220 @@
+"""
+Memory-mapped sources for very large files.
+
+The file is mapped rather than read, indexed by the byte offset of each line,
+and only the lines that fixers look at are decoded. Edits are kept as a piece
+table over the original lines, so saving splices the unchanged byte ranges with
+the edited lines: everything the fixers did not touch, including its encoding,
+trailing whitespace and newline style, is written back byte for byte.
+"""
+import io
+import re
+import mmap
+import codecs
+from array import array
+from bisect import bisect_right
+from tokenize import detect_encoding
+
+
+LONE_CR = re.compile(b"\r(?!\n)")
+
+# Lines decoded per chunk when iterating over an unedited range
+CHUNK_LINES = 4096
+
+
+class MappedSource(object):
+    """
+    A python file mapped into memory, with the offset of every line.
+    Has the `filename`, `encoding` and `lines` of a pipeline.SourceFile.
+    """
+    def __init__(self, filename, handle, data, encoding, bom, offsets, newline):
+        self.filename = filename
+        self.handle = handle
+        self.data = data
+        self.encoding = encoding
+        self.bom = bom
+        # offsets[i] is where line i starts; offsets[-1] is the end of the file
+        self.offsets = offsets
+        self.newline = newline
+        self.decoded = {}
+        self.lines = LazyLines(self, [(0, len(offsets) - 1)])
+
+    def raw(self, start, end):
+        """ The bytes of original lines start..end-1, line endings included """
+        return self.data[self.offsets[start]:self.offsets[end]]
+
+    def line(self, line_no):
+        """ Original line `line_no`, decoded and stripped the way StreamEditor reads it """
+        text = self.decoded.get(line_no)
+        if text is None:
+            text = self.decoded[line_no] = self.raw(line_no, line_no + 1).decode(
+                self.encoding).rstrip()
+        return text
+
+    def padded(self, line_no):
+        """ Whether original line `line_no` has whitespace that `line` strips """
+        raw = self.raw(line_no, line_no + 1).rstrip(b"\r\n")
+        return raw != raw.rstrip()
+
+    def ends_with_newline(self):
+        """ Whether the last line of the file is terminated """
+        return self.data[-1:] == b"\n"
+
+    def close(self):
+        """ Unmap the file """
+        self.decoded = {}
+        self.data.close()
+        self.handle.close()
+
+
+def open_mapped(filename):
+    """
+    Map `filename` and index its lines. Returns None for files this backend
+    cannot represent exactly (empty, lone CR newlines, or an encoding in
+    which b"\\n" is not the newline), which are better read whole.
+    """
+    handle = open(filename, "rb")
+    try:
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        handle.close()
+        return None
+    try:
+        encoding, _ = detect_encoding(io.BytesIO(data[:4096]).readline)
+        bom = b""
+        if encoding == "utf-8-sig":
+            encoding, bom = "utf-8", codecs.BOM_UTF8
+        if "\n".encode(encoding) != b"\n" or LONE_CR.search(data):
+            raise ValueError(encoding)
+        starts = [len(bom)] + [m.end() for m in re.finditer(b"\n", data)]
+        if starts[-1] != len(data):
+            starts.append(len(data))
+        offsets = array("q", starts)
+        newline = b"\r\n" if data[offsets[1] - 2:offsets[1]] == b"\r\n" else b"\n"
+    except (LookupError, SyntaxError, ValueError, IndexError):
+        data.close()
+        handle.close()
+        return None
+    return MappedSource(filename, handle, data, encoding, bom, offsets, newline)
+
+
+class LazyLines(object):
+    """
+    Read-only sequence of the lines of a MappedSource after some edits.
+    `pieces` is a list of (start, end) ranges of original lines and lists of
+    new lines. Edits return a new LazyLines, like the list-based range methods
+    return a new list, so holding a reference is a snapshot.
+    """
+    def __init__(self, source, pieces):
+        self.source = source
+        self.pieces = [piece for piece in pieces if len(self._span(piece))]
+        self.starts = []
+        total = 0
+        for piece in self.pieces:
+            self.starts.append(total)
+            total += len(self._span(piece))
+        self.length = total
+
+    @staticmethod
+    def _span(piece):
+        return piece if isinstance(piece, list) else range(*piece)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return list(self)[index]
+            return list(self._iter(self._cut(start, stop)))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("line index out of range")
+        k = bisect_right(self.starts, index) - 1
+        piece, offset = self.pieces[k], index - self.starts[k]
+        if isinstance(piece, list):
+            return piece[offset]
+        return self.source.line(piece[0] + offset)
+
+    def __iter__(self):
+        return self._iter(self.pieces)
+
+    def padded(self, index):
+        """
+        Whether line `index` is written with trailing whitespace: original lines
+        are copied back byte for byte, so stripping one takes an edit
+        """
+        k = bisect_right(self.starts, index) - 1
+        piece, offset = self.pieces[k], index - self.starts[k]
+        if isinstance(piece, list):
+            return piece[offset] != piece[offset].rstrip()
+        return self.source.padded(piece[0] + offset)
+
+    def __eq__(self, other):
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def _iter(self, pieces):
+        source = self.source
+        for piece in pieces:
+            if isinstance(piece, list):
+                for line in piece:
+                    yield line
+                continue
+            start, end = piece
+            for chunk in range(start, end, CHUNK_LINES):
+                text = source.raw(chunk, min(end, chunk + CHUNK_LINES)).decode(source.encoding)
+                for line in io.StringIO(text, newline=None):
+                    yield line.rstrip()
+
+    def _cut(self, start, stop):
+        """ The pieces covering lines start..stop-1 """
+        cut = []
+        for piece, first in zip(self.pieces, self.starts):
+            span = self._span(piece)
+            last = first + len(span)
+            if last <= start or first >= stop:
+                continue
+            lo, hi = max(start, first) - first, min(stop, last) - first
+            cut.append(piece[lo:hi] if isinstance(piece, list) else (span[lo], span[lo] + hi - lo))
+        return cut
+
+    def replace(self, start, end, new_lines):
+        """ The lines with start..end-1 replaced by `new_lines` """
+        return self.splice([(start, end, new_lines)])
+
+    def splice(self, edits):
+        """ The lines with sorted, non-overlapping (start, end, new lines) edits applied """
+        pieces, last = [], 0
+        for start, end, new_lines in edits:
+            pieces.extend(self._cut(last, start))
+            new_lines = list(new_lines)
+            if new_lines:
+                pieces.append(new_lines)
+            last = end
+        pieces.extend(self._cut(last, self.length))
+        return LazyLines(self.source, pieces)
+
+    def encode(self):
+        """
+        The file contents: unchanged lines are copied from the original bytes,
+        new lines are encoded and terminated the way the original lines are
+        """
+        source = self.source
+        last_line = len(source.offsets) - 1
+        chunks = [source.bom]
+        terminated = True
+        for piece in self.pieces:
+            if not terminated:
+                chunks.append(source.newline)
+            if isinstance(piece, list):
+                chunks.extend(line.encode(source.encoding) + source.newline for line in piece)
+                terminated = True
+            else:
+                chunks.append(source.raw(*piece))
+                terminated = piece[1] != last_line or source.ends_with_newline()
+        return b"".join(chunks)
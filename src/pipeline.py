@@ -0,0 +1,151 @@
+"""
+I/O stages that overlap file reads and writes with fixing:
+a bounded read-ahead of the next files' contents, and a write-behind thread.
+"""
+import os
+import io
+import logging
+import threading
+from collections import namedtuple, deque
+from tokenize import detect_encoding
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+
+SourceFile = namedtuple("SourceFile", ["filename", "data", "encoding", "lines"])
+
+
+def read_source(filename):
+    """ Read a python file as raw bytes and as stripped lines, the way StreamEditor does """
+    with open(filename, "rb") as handle:
+        data = handle.read()
+    encoding, _ = detect_encoding(io.BytesIO(data).readline)
+    text = data.decode(encoding)
+    lines = [line.rstrip() for line in io.StringIO(text, newline=None)]
+    return SourceFile(filename, data, encoding, lines)
+
+
+def open_source(filename, mmap_threshold=0):
+    """
+    Open a python file for fixing: files of at least `mmap_threshold` bytes
+    are memory-mapped (see src.mapped), smaller ones are read whole
+    """
+    if mmap_threshold and os.path.getsize(filename) >= mmap_threshold:
+        from src.mapped import open_mapped
+        source = open_mapped(filename)
+        if source is not None:
+            return source
+    return read_source(filename)
+
+
+def encode_lines(lines, encoding):
+    """ Encode editor lines the way StreamEditor.save writes them """
+    return ("\n".join(lines) + "\n").encode(encoding)
+
+
+def read_ahead(filenames, depth=8, max_size=0):
+    """
+    Yield (filename, SourceFile or IOError) in order, reading up to `depth`
+    files ahead of the consumer on a thread pool. Files of `max_size` bytes
+    or more are not read; None is yielded for them.
+    """
+    filenames = iter(filenames)
+    window = deque()
+    done = object()
+
+    def read(filename):
+        """ Read one file, handing back the error instead of raising it """
+        try:
+            if max_size and os.path.getsize(filename) >= max_size:
+                return None
+            return read_source(filename)
+        except (IOError, OSError, SyntaxError, UnicodeDecodeError) as e:
+            return e
+
+    with ThreadPoolExecutor(depth) as executor:
+        for filename in filenames:
+            window.append((filename, executor.submit(read, filename)))
+            if len(window) >= depth:
+                break
+        while window:
+            filename, future = window.popleft()
+            next_filename = next(filenames, done)
+            if next_filename is not done:
+                window.append((next_filename, executor.submit(read, next_filename)))
+            yield filename, future.result()
+
+
+class WriteBehind(object):
+    """
+    Write files on a background thread. With `fsync`, the files written are
+    synced together in batches of `batch` rather than one at a time. With a
+    `journal` (src.journal.Journal), each change is journaled, on the same
+    thread, before the file is written.
+    """
+    def __init__(self, fsync=False, batch=32, maxsize=64, journal=None):
+        self.fsync = fsync
+        self.journal = journal
+        self.batch = batch
+        self.queue = Queue(maxsize)
+        self.errors = []
+        self.thread = threading.Thread(target=self._run, name="write-behind")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def put(self, filename, data, original=None):
+        """
+        Queue `data` to be written to `filename`; blocks while the queue is full.
+        `original` is the file's current contents, for the journal (None: read it).
+        """
+        self.queue.put((filename, data, original))
+
+    def _run(self):
+        unsynced = []
+        while True:
+            job = self.queue.get()
+            if job is not None:
+                filename, data, original = job
+                try:
+                    if self.journal is not None:
+                        if original is None:
+                            with open(filename, "rb") as handle:
+                                original = handle.read()
+                        self.journal.record(filename, original, data)
+                    handle = open(filename, "wb")
+                    handle.write(data)
+                    handle.flush()
+                    if self.fsync:
+                        unsynced.append(handle)
+                    else:
+                        handle.close()
+                except (IOError, OSError) as e:
+                    LOGGER.exception("write({0})".format(filename))
+                    self.errors.append((filename, e))
+            if unsynced and (job is None or len(unsynced) >= self.batch or self.queue.empty()):
+                self._sync(unsynced)
+                unsynced = []
+            if job is None:
+                return
+
+    def _sync(self, handles):
+        for handle in handles:
+            try:
+                os.fsync(handle.fileno())
+            except (IOError, OSError) as e:
+                LOGGER.exception("fsync({0})".format(handle.name))
+                self.errors.append((handle.name, e))
+            finally:
+                handle.close()
+
+    def close(self):
+        """ Wait for every queued write (and sync) to finish """
+        self.queue.put(None)
+        self.thread.join()
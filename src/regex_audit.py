@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the report and repair regexes against adversarial inputs.
+
+Every pattern in table_regex, action_regex and repair_regex is timed on inputs
+of size n and GROWTH * n. A linear pattern takes about GROWTH times as long on
+the larger input; a pattern whose time grows much faster than that is flagged
+as super-linear.
+
+    python -m src.regex_audit
+"""
+from __future__ import print_function
+
+import re
+import sys
+import timeit
+from optparse import make_option, OptionParser
+
+from src import table_regex, action_regex
+from src.guard import LineTimeout, time_limit
+from src.repair_regex import WHITESPACE_TABLE
+
+
+GROWTH = 8
+
+# A pattern is flagged if its time grows by more than this factor when its input
+# grows by GROWTH: well above linear (8) and well below quadratic (64).
+MAX_RATIO = 24
+
+# Times below this are too small to compare reliably
+MIN_TIME = 1e-4
+
+# A single match that takes longer than this is cut off and flagged
+MAX_TIME = 1.0
+
+# Adversarial inputs: prefix + unit * n + suffix. The units repeat the
+# characters the patterns' lazy and greedy groups fight over, and the
+# suffixes make the final anchor fail.
+ADVERSARIAL = [
+    ("", "a", "!"),
+    ("", " ", "!"),
+    ("", "a ", "!"),
+    ("", "a,", "!"),
+    ("", "a :", "!"),
+    ("", "( ", "!"),
+    ("", "a = ", "!"),
+    ("", "a == ", "!"),
+    ("", "a.b (c) ", "!"),
+    ("C: 1, 0: ", "a (", "!"),
+    ("C: 1, 0: ", "a (b) ", "!"),
+    ("C: 1, 0: ", "a ", "(b-c)!"),
+    ("if ", "a and ", "b"),
+    ("if ", "a or ", "b"),
+    ("if ", "a and b: ", "c"),
+    ("if ", " ", ":"),
+    ("if ", "a and ", ":!"),
+    ("C: 1, 0: ", " ", "(b)!"),
+    ("from ", "a.b ", "import c!"),
+    ("Wrong hanging indentation (", "add ", "!"),
+    ("******** Module ", "a", "!"),
+]
+
+
+def patterns():
+    """ Yield (name, fn) for every pattern, where fn(text) runs it the way the code does """
+    for module in (table_regex, action_regex):
+        for name, value in sorted(vars(module).items()):
+            if isinstance(value, type(re.compile(""))):
+                yield "{0}.{1}".format(module.__name__, name), value.match
+
+    for desc, repairs in sorted(WHITESPACE_TABLE.items()):
+        for i, (regex, repl, kwargs) in enumerate(repairs):
+            compiled = re.compile(regex)
+
+            def sub(text, compiled=compiled, repl=repl, kwargs=kwargs):
+                """ Apply the repair as bad_whitespace does """
+                return compiled.sub(repl, text, **kwargs)
+            yield "WHITESPACE_TABLE[{0!r}][{1}]".format(desc, i), sub
+
+
+def best_time(fn, text, repeat=3):
+    """ Best of `repeat` timings of fn(text), or None if it ran longer than MAX_TIME """
+    try:
+        with time_limit(MAX_TIME):
+            return min(timeit.repeat(lambda: fn(text), number=1, repeat=repeat))
+    except LineTimeout:
+        return None
+
+
+def audit(size=1000):
+    """
+    Time every pattern on every adversarial input at `size` and GROWTH * `size`.
+    Returns a list of (pattern name, input description, small time, large time, flagged).
+    """
+    results = []
+    for name, fn in patterns():
+        worst = None
+        for prefix, unit, suffix in ADVERSARIAL:
+            small = best_time(fn, prefix + unit * size + suffix)
+            large = small and best_time(fn, prefix + unit * (GROWTH * size) + suffix)
+            if small is None or large is None:
+                small, large, flagged = small or MAX_TIME, MAX_TIME, True
+            else:
+                flagged = large > MIN_TIME and large > MAX_RATIO * max(small, MIN_TIME / GROWTH)
+            result = (name, "{0!r} + {1!r} * n + {2!r}".format(prefix, unit, suffix),
+                      small, large, flagged)
+            if worst is None or (flagged, large) > (worst[4], worst[3]):
+                worst = result
+            if flagged:
+                break
+        results.append(worst)
+    return results
+
+
+def main(argv=None):
+    """ Print the worst case of each pattern; exit non-zero if any is super-linear """
+    option_list = [
+        make_option('-n', '--size', dest="size", type="int", default=1000,
+                    help="Number of repeated units in the smaller input"),
+    ]
+    parser = OptionParser(usage="%prog [options]", option_list=option_list)
+    options, _ = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    results = audit(options.size)
+    for name, text, small, large, flagged in results:
+        print("{0:6} {1:>10.6f}s {2:>10.6f}s x{3:<7.1f} {4}  {5}".format(
+            "SLOW" if flagged else "ok", small, large,
+            large / small if small else 0.0, name, text))
+    return 1 if any(flagged for _, _, _, _, flagged in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Splitting a module into regions whose messages can be fixed in parallel.
+
+A module is only cut where a top-level `def` or `class` (or its first
+decorator) starts, so each fixer sees the definition around its message just
+as it would in the whole file. Each region's fixes come back as edits to the
+original lines of the module; the edits are merged, and edits that overlap
+are a conflict, in which case the module is fixed serially instead.
+"""
+import re
+from bisect import bisect_left, bisect_right
+
+
+TOP_LEVEL = re.compile(r"(?:@|def |class |async def )")
+
+
+class RegionConflict(Exception):
+    """ Fixes from different regions, or file-wide fixes, touch the same lines """
+    pass
+
+
+def boundaries(lines):
+    """ Yield the line numbers where a top-level definition, with its decorators, starts """
+    decorated = False
+    for line_no, line in enumerate(lines):
+        if TOP_LEVEL.match(line):
+            if not decorated:
+                yield line_no
+            decorated = line.startswith("@")
+
+
+def region_bounds(lines, items, parts):
+    """
+    Cut `lines` at definition boundaries into at most `parts` (start, end)
+    regions holding about as many of `items` each
+    """
+    line_nos = sorted(item.line_no for item in items)
+    target = len(line_nos) / float(parts)
+    bounds, start = [], 0
+    for cut in boundaries(lines):
+        if len(bounds) == parts - 1:
+            break
+        if cut > start and bisect_left(line_nos, cut) >= target * (len(bounds) + 1):
+            bounds.append((start, cut))
+            start = cut
+    bounds.append((start, len(lines)))
+    return bounds
+
+
+def region_items(bounds, items):
+    """ Group `items` by the region of `bounds` their line falls in """
+    starts = [start for start, _ in bounds]
+    grouped = [[] for _ in bounds]
+    for item in items:
+        grouped[bisect_right(starts, item.line_no) - 1].append(item)
+    return grouped
+
+
+def region_edits(start, length, lines, origin):
+    """
+    The (start, end, new lines) edits to the module that give a region, which
+    began at line `start` with `length` lines, its fixed `lines`.
+    origin[i] is the region line that fixed line i was, or None for a new line.
+    """
+    edits = []
+    expected, new_lines = 0, []
+    for line, source in zip(lines, origin):
+        if source is None:
+            new_lines.append(line)
+            continue
+        if source != expected or new_lines:
+            edits.append((start + expected, start + source, new_lines))
+            new_lines = []
+        expected = source + 1
+    if expected != length or new_lines:
+        edits.append((start + expected, start + length, new_lines))
+    return edits
+
+
+def merge_edits(edit_lists):
+    """
+    Merge the edits of several regions, in region order, into one sorted list,
+    raising RegionConflict if two of them overlap
+    """
+    # The sort is stable, so insertions at a region boundary keep their order
+    merged = sorted((edit for edits in edit_lists for edit in edits), key=lambda e: e[:2])
+    for (start1, end1, _), (start2, end2, _) in zip(merged, merged[1:]):
+        if start2 < end1:
+            raise RegionConflict("lines {0}-{1} and {2}-{3}".format(
+                start1 + 1, end1, start2 + 1, end2))
+    return merged
+
+
+def map_line(edits, line_no):
+    """
+    Where original line `line_no` is once the merged `edits` are applied;
+    RegionConflict if an edit changed it
+    """
+    shift = 0
+    for start, end, new_lines in edits:
+        if end <= line_no:
+            shift += len(new_lines) - (end - start)
+        elif start <= line_no:
+            raise RegionConflict("line {0} was changed".format(line_no + 1))
+        else:
+            break
+    return line_no + shift
@@ -0,0 +1,160 @@
+"""
+Registry of fixers, keyed by pylint error code.
+
+Fixers are named by "module:function" and only imported the first time their
+error code is looked up, so a run only pays for the fixers its report needs.
+Third-party packages add (or replace) fixers by declaring entry points:
+
+    entry_points={
+        'autopylint.fixers': [
+            'consider-using-f-string = mypkg.fixers:f_string',
+        ],
+    }
+
+Discovering entry points means reading every installed distribution's metadata,
+so the result is cached, keyed on the directories of sys.path.
+"""
+import os
+import sys
+import json
+import logging
+from importlib import import_module
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "autopylint.fixers"
+
+PLUGIN_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "autopylint", "plugins.json")
+
+BUILTIN_FIXERS = {
+    "anomalous-backslash-in-string": "src.fixers.expressions:anomalous_backslash_in_string",
+    "bad-continuation": "src.fixers.whitespace:bad_continuation",
+    "bad-whitespace": "src.fixers.whitespace:bad_whitespace",
+    "invalid-name": "src.fixers.expressions:invalid_name",
+    "len-as-condition": "src.fixers.expressions:len_as_condition",
+    "line-too-long": "src.fixers.whitespace:line_too_long",
+    "misplaced-comparison-constant": "src.fixers.expressions:misplaced_comparison_constant",
+    "missing-docstring": "src.fixers.functions:missing_docstring",
+    "no-self-use": "src.fixers.functions:no_self_use",
+    "no-value-for-parameter": "src.fixers.functions:no_value_for_parameter",
+    "relative-import": "src.fixers.imports:relative_import",
+    "superfluous-parens": "src.fixers.expressions:superfluous_parens",
+    "trailing-newline": "src.fixers.whitespace:trailing_newline",
+    "trailing-whitespace": "src.fixers.whitespace:trailing_whitespace",
+    "ungrouped-imports": "src.fixers.imports:ungrouped_imports",
+    "unused-argument": "src.fixers.functions:unused_argument",
+    "unused-import": "src.fixers.imports:unused_import",
+    "unused-variable": "src.fixers.expressions:unused_variable",
+    "wrong-import-order": "src.fixers.imports:wrong_import_order",
+    "dangerous-default-value": "src.fixers.functions:dangerous_default_value",
+}
+
+
+def no_op(_, item):
+    """ Pylint no-op method """
+    line_no = item.line_no
+    LOGGER.debug("'{0}' --> no-op".format(item.desc))
+    return (line_no, 0)
+
+
+def load(spec):
+    """ Import the fixer named by "module:function" """
+    module_name, _, attr = spec.partition(":")
+    return getattr(import_module(module_name), attr)
+
+
+def path_fingerprint():
+    """ Identify the set of installed distributions by the sys.path directories' mtimes """
+    fingerprint = []
+    for path in sys.path:
+        try:
+            fingerprint.append([path, os.stat(path or ".").st_mtime])
+        except OSError:
+            pass
+    return fingerprint
+
+
+def discover_plugins():
+    """ Read the fixer entry points of every installed distribution """
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        return {}
+    found = entry_points()
+    if hasattr(found, "select"):
+        found = found.select(group=ENTRY_POINT_GROUP)
+    else:
+        found = found.get(ENTRY_POINT_GROUP, [])
+    return {ep.name: ep.value for ep in found}
+
+
+def cached_plugins(cache=None):
+    """ The fixer entry points, from the cache if sys.path has not changed since """
+    cache = cache or PLUGIN_CACHE
+    fingerprint = path_fingerprint()
+    try:
+        with open(cache) as handle:
+            cached = json.load(handle)
+        if cached["fingerprint"] == fingerprint:
+            return cached["plugins"]
+    except (IOError, OSError, ValueError, KeyError):
+        pass
+
+    plugins = discover_plugins()
+    try:
+        dirname = os.path.dirname(cache)
+        if dirname and not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        with open(cache, "w") as handle:
+            json.dump({"fingerprint": fingerprint, "plugins": plugins}, handle)
+    except (IOError, OSError):
+        LOGGER.debug("Could not write plugin cache {0}".format(cache))
+    return plugins
+
+
+class FixerRegistry(object):
+    """
+    Mapping of error code to fixer function that imports each fixer on first use.
+    Membership and the list of codes only need the specs, not the fixers.
+    """
+    def __init__(self, specs, plugins=None):
+        self.specs = dict(specs)
+        self.plugins = plugins
+        self.loaded = {}
+
+    def _all_specs(self):
+        if self.plugins is not None:
+            plugins, self.plugins = self.plugins, None
+            for code, spec in (plugins() if callable(plugins) else plugins).items():
+                if code in self.specs:
+                    LOGGER.info("Fixer for {0} replaced by plugin {1}".format(code, spec))
+                self.specs[code] = spec
+        return self.specs
+
+    def __contains__(self, code):
+        return code in self._all_specs()
+
+    def __iter__(self):
+        return iter(self._all_specs())
+
+    def __len__(self):
+        return len(self._all_specs())
+
+    def __getitem__(self, code):
+        func = self.loaded.get(code)
+        if func is None:
+            func = self.loaded[code] = load(self._all_specs()[code])
+        return func
+
+    def get(self, code, default=None):
+        """ The fixer for `code`, or `default` if there is none """
+        return self[code] if code in self else default
+
+    def keys(self):
+        """ The error codes that have a fixer """
+        return self._all_specs().keys()
+
+
+FN_TABLE = FixerRegistry(BUILTIN_FIXERS, cached_plugins)
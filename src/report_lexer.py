@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+"""
+Single-pass lexer for pylint's text report.
+
+Each line is classified by its first character, so most lines are matched
+against at most one pattern. Messages whose error code is on a later line
+(a "semi item", followed by the source line and a `^^^ (error)` line) are
+stitched together as the lines go by, and Items are yielded directly.
+
+    python -m src.report_lexer report [report ...]    # parse-only benchmark
+"""
+from __future__ import print_function
+
+import sys
+import time
+import logging
+from optparse import make_option, OptionParser
+
+from src.item import Item
+from src.table_regex import (
+    MODULE_NAME,
+    PYLINT_ITEM,
+    PYLINT_SEMI_ITEM,
+    PYLINT_ERROR_ITEM,
+)
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+MESSAGE_TYPES = frozenset("ERCW")
+
+# A semi item's error line is this many lines after it (the source line is in between)
+SEMI_ITEM_DISTANCE = 2
+
+
+def semi_item(match):
+    """ Item for a semi item; its error code is filled in from a later line """
+    return Item(
+        match.group("type"),
+        int(match.group("where1")) - 1,
+        int(match.group("where2")),
+        match.group("desc").rstrip(),
+        ""
+    )
+
+
+def parse_report(lines):
+    """
+    Yield (module name, [Item]) for each module of the report `lines` (an
+    iterable, such as an open file) that has messages, in report order
+    """
+    match_item = PYLINT_ITEM.match
+    append = None
+    module, items = None, []
+    semi, semi_line = None, 0
+    for line_no, line in enumerate(lines):
+        if semi is not None:
+            if line_no - semi_line < SEMI_ITEM_DISTANCE:
+                # The source line pylint quotes under the message
+                continue
+            m = PYLINT_ERROR_ITEM.match(line.rstrip())
+            item, semi = semi, None
+            if m:
+                append(item._replace(error=m.group("error")))
+                continue
+            # Not the error line after all: drop the semi item and lex this line as usual
+            LOGGER.debug("No error code for '{0}' at report line {1}".format(
+                item.desc, semi_line + 1))
+        first = line[:1]
+        if first in MESSAGE_TYPES and line[1:2] == ":" and append is not None:
+            line = line.rstrip()
+            m = match_item(line)
+            if m:
+                kind, where1, where2, desc, error = m.groups()
+                append(Item(kind, int(where1) - 1, int(where2), desc.rstrip(), error))
+                continue
+            m = PYLINT_SEMI_ITEM.match(line)
+            if m:
+                semi, semi_line = semi_item(m), line_no
+        elif first == "*":
+            m = MODULE_NAME.match(line.rstrip())
+            if m:
+                if items:
+                    yield module, items
+                module, items = m.group("filename"), []
+                append = items.append
+    if items:
+        yield module, items
+
+
+def lex_report(lines):
+    """ Yield (module name, Item) for every message in the report `lines` """
+    for module, items in parse_report(lines):
+        for item in items:
+            yield module, item
+
+
+def benchmark(filename, repeat=3):
+    """ Best time to parse a report, with its line, module and message counts """
+    best, modules, items = None, 0, 0
+    for _ in range(repeat):
+        start = time.time()
+        with open(filename) as handle:
+            parsed = list(parse_report(handle))
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+        modules, items = len(parsed), sum(len(module_items) for _, module_items in parsed)
+    with open(filename) as handle:
+        lines = sum(1 for _ in handle)
+    return best, lines, modules, items
+
+
+def main(argv=None):
+    """ Parse-only benchmark: print the parse rate of each report """
+    option_list = [
+        make_option('-n', '--repeat', dest="repeat", type="int", default=3,
+                    help="Number of timed runs; the best is reported"),
+    ]
+    parser = OptionParser(usage="%prog [options] report [report ...]", option_list=option_list)
+    options, args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if not args:
+        parser.error("expected at least one report")
+    for filename in args:
+        seconds, lines, modules, items = benchmark(filename, options.repeat)
+        print("{0}: {1} lines, {2} modules, {3} messages in {4:.3f}s "
+              "({5:,.0f} lines/s)".format(filename, lines, modules, items, seconds,
+                                          lines / seconds if seconds else 0.0))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
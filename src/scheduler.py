@@ -0,0 +1,167 @@
+"""
+Cost model and largest-first dispatch of modules to worker processes
+"""
+import os
+import sys
+import json
+import heapq
+import logging
+from concurrent.futures import wait, FIRST_COMPLETED
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+# Pseudo-error under which the per-byte cost of reading and checking a file is kept
+BYTES = "<bytes>"
+
+# Seconds per item and per byte to assume until a run has measured them
+DEFAULT_ITEM_COST = 50e-6
+DEFAULT_BYTE_COST = 20e-9
+
+# Once a running total covers this many samples it is halved, so that the
+# model keeps following changes in the fixers instead of freezing.
+MAX_SAMPLES = 100000
+
+# Number of parsed modules buffered ahead of the fixers to pick the most expensive from
+SCHEDULE_WINDOW = 256
+
+
+class CostModel(object):
+    """
+    Estimate how long a module will take to fix from its size and its messages.
+    `timings` maps an error code (or BYTES) to [total seconds, number of samples].
+    """
+    def __init__(self, timings=None):
+        self.timings = timings or {}
+
+    @classmethod
+    def load(cls, filename):
+        """ Load timings stored by an earlier run, or start from the defaults """
+        try:
+            with open(filename) as handle:
+                return cls(json.load(handle))
+        except (IOError, OSError, ValueError):
+            return cls()
+
+    def save(self, filename):
+        """ Store the timings for the next run """
+        try:
+            dirname = os.path.dirname(filename)
+            if dirname and not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            with open(filename, "w") as handle:
+                json.dump(self.timings, handle, indent=1, sort_keys=True)
+        except (IOError, OSError):
+            LOGGER.exception("CostModel.save({0})".format(filename))
+
+    def unit_cost(self, key, default):
+        """ Mean measured cost of one sample of `key` """
+        seconds, samples = self.timings.get(key, (0.0, 0))
+        return seconds / samples if samples else default
+
+    def estimate(self, filename, items, size=None):
+        """ Estimated seconds to fix `items` in `filename` (of `size` bytes, if known) """
+        if size is None:
+            size = file_size(filename)
+        item_cost = {}
+        cost = size * self.unit_cost(BYTES, DEFAULT_BYTE_COST)
+        for item in items:
+            if item.error not in item_cost:
+                item_cost[item.error] = self.unit_cost(item.error, DEFAULT_ITEM_COST)
+            cost += item_cost[item.error]
+        return cost
+
+    def update(self, timings):
+        """ Fold in the timings measured while fixing one module """
+        for key, (seconds, samples) in timings.items():
+            total = self.timings.setdefault(key, [0.0, 0])
+            total[0] += seconds
+            total[1] += samples
+            if total[1] > MAX_SAMPLES:
+                total[0] /= 2
+                total[1] //= 2
+
+
+def file_size(filename):
+    """ Size of `filename` in bytes, 0 if it cannot be read """
+    try:
+        return os.path.getsize(filename)
+    except OSError:
+        return 0
+
+
+class WorkQueue(object):
+    """
+    Bounded buffer of (filename, items) jobs between the report parser and the
+    fixers. `jobs` is consumed lazily and only while fewer than `window` jobs
+    are buffered, so parsing stays just ahead of fixing; of the buffered jobs,
+    the most expensive is handed out first.
+    """
+    def __init__(self, jobs, model, window=SCHEDULE_WINDOW):
+        self.jobs = iter(jobs)
+        self.model = model
+        self.window = window
+        self.heap = []
+        self.count = 0
+        self.peak = 0
+
+    def _fill(self):
+        for filename, items in self.jobs:
+            cost = self.model.estimate(filename, items)
+            # count breaks ties in arrival order, and keeps jobs out of the comparison
+            heapq.heappush(self.heap, (-cost, self.count, (filename, items)))
+            self.count += 1
+            self.peak = max(self.peak, len(self.heap))
+            if len(self.heap) >= self.window:
+                break
+
+    def __iter__(self):
+        while True:
+            if len(self.heap) < self.window:
+                self._fill()
+            if not self.heap:
+                return
+            yield heapq.heappop(self.heap)[2]
+
+
+def dispatch(executor, fn, jobs, in_flight, max_bytes=0):
+    """
+    Submit fn(*job) for each job in order, keeping at most `in_flight` running
+    or queued at once, and yield the results as they complete.
+    With `max_bytes`, a job is also held back while the files of the running
+    jobs (job[0]) total `max_bytes` or more; one job always runs.
+    """
+    jobs = iter(jobs)
+    running = {}
+    running_bytes = 0
+    while True:
+        while len(running) < in_flight and (not running or not max_bytes or
+                                            running_bytes < max_bytes):
+            job = next(jobs, None)
+            if job is None:
+                break
+            size = file_size(job[0]) if max_bytes else 0
+            running[executor.submit(fn, *job)] = size
+            running_bytes += size
+        if not running:
+            return
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            running_bytes -= running.pop(future)
+            yield future.result()
+
+
+def peak_rss():
+    """
+    Peak resident set size in bytes of this process and of its largest
+    (waited for) child, or None where the resource module is not available
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes, except on macOS where it is in bytes
+    scale = 1 if sys.platform == "darwin" else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale)
@@ -0,0 +1,173 @@
+"""
+`autopylint stats`: counts of the messages of a pylint report, as JSON.
+
+The report is read by the same lexer as a run, into a compact form (how many
+messages of each type and error code each module has), which is cached by the
+report's path, size and modification time, so asking again about a report
+that has not changed does not read it again. Messages are counted by error
+code, module and type, and split by whether FN_TABLE has a fixer that edits
+anything for them (stub fixers, marked `edits = False`, do not count); the
+fixable messages are the edits a run would make, at most.
+
+    autopylint stats [options] report
+"""
+from __future__ import print_function
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from collections import Counter, OrderedDict
+from optparse import make_option, OptionParser
+
+from src.registry import FN_TABLE
+from src.report_lexer import parse_report
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+STATS_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "autopylint", "stats")
+
+# Bumped whenever the parsed form changes, to invalidate old caches
+CACHE_VERSION = 1
+
+
+def report_key(filename):
+    """ What identifies the contents of a report without reading it """
+    st = os.stat(filename)
+    return [os.path.abspath(filename), st.st_size, st.st_mtime_ns]
+
+
+def parse_counts(filename):
+    """ {module: [[type, error, count], ...]} for the messages of a report """
+    counts = {}
+    with open(filename) as handle:
+        for module, items in parse_report(handle):
+            # A report of several pylint runs can name a module more than once
+            tally = counts.setdefault(module, Counter())
+            tally.update((item.type, item.error) for item in items)
+    return dict(
+        (module, [[kind, error, count] for (kind, error), count in sorted(tally.items())])
+        for module, tally in counts.items()
+    )
+
+
+def cache_file(key, cache_dir):
+    """ Where the parsed form of the report identified by `key` is cached """
+    name = hashlib.sha1(key[0].encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, "{0}.json".format(name))
+
+
+def load_counts(filename, cache_dir=STATS_CACHE):
+    """ The parsed form of a report, from the cache if the report is unchanged """
+    key = report_key(filename)
+    cache = cache_file(key, cache_dir) if cache_dir else None
+    if cache:
+        try:
+            with open(cache) as handle:
+                cached = json.load(handle)
+            if cached.get("version") == CACHE_VERSION and cached.get("key") == key:
+                return cached["counts"]
+        except (IOError, OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    counts = parse_counts(filename)
+    if cache:
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            with open(cache, "w") as handle:
+                json.dump({"version": CACHE_VERSION, "key": key, "counts": counts}, handle)
+        except (IOError, OSError):
+            LOGGER.debug("Could not write stats cache {0}".format(cache))
+    return counts
+
+
+def in_package(module, prefix):
+    """ Whether `module` is the module or package `prefix`, or inside it """
+    return module == prefix or module.startswith(prefix + ".")
+
+
+def makes_edits(code, fixers=FN_TABLE):
+    """ Whether `code` has a fixer, and not a stub that leaves every line alone """
+    return code in fixers and getattr(fixers[code], "edits", True)
+
+
+def statistics(counts, codes=None, prefix=None, top=0, fixers=FN_TABLE):
+    """
+    Aggregate the parsed form of a report, keeping only the messages with one
+    of `codes` (if given) in the modules under `prefix` (if given). `top` limits
+    the modules listed to the ones with the most messages (0: all of them).
+    """
+    by_code, by_module, by_type = Counter(), Counter(), Counter()
+    editable = {}
+    fixable = files = 0
+    for module, entries in counts.items():
+        if prefix and not in_package(module, prefix):
+            continue
+        module_fixable = 0
+        for kind, error, count in entries:
+            if codes and error not in codes:
+                continue
+            by_code[error] += count
+            by_module[module] += count
+            by_type[kind] += count
+            if error not in editable:
+                editable[error] = makes_edits(error, fixers)
+            if editable[error]:
+                module_fixable += count
+        fixable += module_fixable
+        files += bool(module_fixable)
+    messages = sum(by_code.values())
+    return OrderedDict([
+        ("messages", messages),
+        ("modules", len(by_module)),
+        ("fixable", fixable),
+        ("not_fixable", messages - fixable),
+        # What a run would do, at most: fixers may leave some lines alone
+        ("projected", OrderedDict([("edits", fixable), ("files", files)])),
+        ("by_type", OrderedDict(by_type.most_common())),
+        ("by_code", OrderedDict(
+            (code, OrderedDict([("count", count), ("fixable", editable[code])]))
+            for code, count in by_code.most_common()
+        )),
+        ("by_module", OrderedDict(by_module.most_common(top or None))),
+    ])
+
+
+def main(argv):
+    """ Entry point for `autopylint stats` """
+    option_list = [
+        make_option('--code', dest="codes", action="append", default=None, metavar="CODE",
+                    help="Only count messages with this error code (may be repeated)"),
+        make_option('--module', dest="prefix", default=None, metavar="NAME",
+                    help="Only count messages in this module or package"),
+        make_option('--top', dest="top", type="int", default=20, metavar="N",
+                    help="List the N modules with the most messages (0: all)"),
+        make_option('--no-cache', dest="cache", action="store_false", default=True,
+                    help="Parse the report again even if it has not changed"),
+    ]
+    parser = OptionParser(
+        usage="%prog stats [options] report",
+        option_list=option_list,
+        add_help_option=True
+    )
+    options, args = parser.parse_args(argv)
+    if len(args) != 1:
+        parser.error("expected one report")
+    try:
+        counts = load_counts(args[0], STATS_CACHE if options.cache else None)
+    except (IOError, OSError) as e:
+        LOGGER.error("autopylint stats: {0}".format(e))
+        return 2
+    stats = statistics(counts, options.codes and frozenset(options.codes),
+                       options.prefix, options.top)
+    stats["report"] = args[0]
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -13,6 +13,8 @@ MODULE_NAME = re.compile(r"""
 
 #C: 75, 0: Unnecessary parens after 'print' keyword (superfluous-parens)
 #C: 14, 0: Too many lines in module (6953/1000) (too-many-lines)
+# The error code cannot contain spaces or parens, so it is always the last
+# parenthesised group: desc is greedy and backtracks only over the error code.
 PYLINT_ITEM = re.compile(r"""
     ^
     (?P<type>[ERCW]):
@@ -20,11 +22,11 @@ PYLINT_ITEM = re.compile(r"""
     (?P<where1>\d+),
     \s*
     (?P<where2>-?\d+):
-    \s+
-    (?P<desc>[\w\d\s\.\(\)/',]+?)
+    \s+(?!\s)
+    (?P<desc>[\w\d\s\.\(\)/',]+)
     \s
     \(
-    (?P<error>[\w_\.-]+?)
+    (?P<error>[\w_\.-]+)
     \)
     $
 """, re.VERBOSE)
@@ -38,7 +40,7 @@ PYLINT_SEMI_ITEM = re.compile(r"""
     (?P<where1>\d+),
     \s*
     (?P<where2>-?\d+):
-    \s+
+    \s+(?!\s)
     (?P<desc>[\w\d\s\.\(\)/]+?)
     $
 """, re.VERBOSE)
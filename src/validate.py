@@ -0,0 +1,35 @@
+"""
+Syntax validation of fixed buffers before they are saved
+"""
+
+
+def lines_to_source(lines):
+    """ Join editor lines the way StreamEditor.save writes them """
+    return "\n".join(lines) + "\n"
+
+
+def check_source(filename, source):
+    """
+    Compile `source` (text, or bytes decoded by their coding cookie);
+    return None if it is valid, else a description of the error
+    """
+    try:
+        compile(source, filename, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError) as e:
+        return "{0}: {1}".format(type(e).__name__, e)
+    return None
+
+
+def first_failure(filename, snapshots):
+    """
+    Bisect a sequence of line-list snapshots, the last of which is known not to
+    compile, for the index of the first one that does not compile
+    """
+    lo, hi = 0, len(snapshots) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if check_source(filename, lines_to_source(snapshots[mid])) is None:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
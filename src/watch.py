@@ -0,0 +1,235 @@
+"""
+`autopylint watch`: re-lint and fix python files as they change.
+
+Files are polled for changes (by mtime and size, confirmed by content hash),
+and once they have been quiet for a moment, only the changed files are linted
+by a pylint kept warm in this process and fixed straight away. Each cycle logs
+how long it took from the first change seen to the fixes being written.
+
+    autopylint watch [options] path [path ...]
+"""
+import os
+import sys
+import time
+import hashlib
+import logging
+from collections import defaultdict
+from optparse import make_option, OptionParser
+
+from src.item import Item
+from src.import_graph import find_modules
+
+
+# pylint: disable=logging-format-interpolation
+LOGGER = logging.getLogger(__name__)
+
+
+class FileWatcher(object):
+    """ Detect changed python files under `paths` by polling """
+    def __init__(self, paths):
+        self.paths = paths
+        self.stats = {}
+        self.hashes = {}
+
+    def files(self):
+        """ The python files being watched """
+        for path in self.paths:
+            if os.path.isdir(path):
+                for filename in find_modules(path):
+                    yield os.path.normpath(filename)
+            elif os.path.exists(path):
+                yield os.path.normpath(path)
+
+    def poll(self):
+        """
+        Return the set of files created or changed since the last poll. Only
+        files whose mtime or size changed are read, and a file whose content
+        hash is unchanged (e.g. touched, or saved twice) does not count.
+        """
+        changed = set()
+        seen = set()
+        for filename in self.files():
+            seen.add(filename)
+            try:
+                st = os.stat(filename)
+            except OSError:
+                continue
+            stat = (st.st_mtime_ns, st.st_size)
+            if self.stats.get(filename) == stat:
+                continue
+            self.stats[filename] = stat
+            try:
+                with open(filename, "rb") as handle:
+                    file_hash = hashlib.sha1(handle.read()).hexdigest()
+            except (IOError, OSError):
+                continue
+            if self.hashes.get(filename) != file_hash:
+                self.hashes[filename] = file_hash
+                changed.add(filename)
+        for filename in set(self.stats) - seen:
+            del self.stats[filename]
+            self.hashes.pop(filename, None)
+        return changed
+
+    def record(self, filename, data):
+        """ Note that we wrote `data` to `filename`, so that it is not seen as a change """
+        st = os.stat(filename)
+        self.stats[filename] = (st.st_mtime_ns, st.st_size)
+        self.hashes[filename] = hashlib.sha1(data).hexdigest()
+
+
+def settle(watcher, changed, debounce):
+    """ Keep polling until no more files change for `debounce` seconds; return all changed """
+    while True:
+        time.sleep(debounce)
+        more = watcher.poll()
+        if not more:
+            return changed
+        changed |= more
+
+
+class WarmLinter(object):
+    """
+    Run pylint in this process, so that its start-up and the astroid trees of
+    the unchanged modules are shared by every cycle
+    """
+    def __init__(self, rcfile=None):
+        from pylint import lint
+        from pylint.reporters import CollectingReporter
+        self.run = lint.Run
+        self.reporter_class = CollectingReporter
+        self.args = ["--rcfile={0}".format(rcfile)] if rcfile else []
+
+    @staticmethod
+    def forget(filenames):
+        """ Drop the cached astroid trees of changed files, so they are parsed again """
+        from astroid import MANAGER
+        paths = set(os.path.abspath(filename) for filename in filenames)
+        for name, module in list(MANAGER.astroid_cache.items()):
+            if module.file and os.path.abspath(module.file) in paths:
+                del MANAGER.astroid_cache[name]
+
+    def __call__(self, filenames):
+        """ Lint `filenames`, returning pylint's messages """
+        self.forget(filenames)
+        reporter = self.reporter_class()
+        self.run(self.args + sorted(filenames), reporter=reporter, exit=False)
+        return reporter.messages
+
+
+def message_items(messages):
+    """ Group pylint messages into {filename: [Item]} """
+    items = defaultdict(list)
+    for message in messages:
+        items[os.path.normpath(message.path)].append(Item(
+            message.C,
+            message.line - 1,
+            message.column,
+            message.msg.rstrip(),
+            message.symbol,
+        ))
+    return items
+
+
+def run_cycle(changed, lint, settings, watcher, journal=None):
+    """
+    Lint and fix the changed files. Returns (messages, files fixed, lint seconds,
+    fix seconds) for the latency report.
+    """
+    from src.autopylint import fix_module
+
+    start = time.time()
+    by_file = message_items(lint(changed))
+    linted = time.time()
+    fixed = 0
+    for filename, items in sorted(by_file.items()):
+        if filename not in changed:
+            continue
+        result = fix_module(filename, items, settings)
+        if result is None or result.data is None:
+            continue
+        original = result.original
+        if original is None:
+            with open(filename, "rb") as handle:
+                original = handle.read()
+        if journal:
+            journal.record(filename, original, result.data)
+        with open(filename, "wb") as handle:
+            handle.write(result.data)
+        watcher.record(filename, result.data)
+        fixed += 1
+    return (sum(len(items) for items in by_file.values()), fixed,
+            linted - start, time.time() - linted)
+
+
+def watch(paths, settings, lint, interval=0.5, debounce=0.2, journal=None, cycles=None):
+    """ Watch `paths`, fixing changed files, for `cycles` cycles (or forever) """
+    watcher = FileWatcher(paths)
+    watcher.poll()
+    LOGGER.info("Watching {0} files".format(len(watcher.stats)))
+    cycle = 0
+    while cycles is None or cycle < cycles:
+        changed = watcher.poll()
+        if not changed:
+            time.sleep(interval)
+            continue
+        seen = time.time()
+        changed = settle(watcher, changed, debounce)
+        cycle += 1
+        messages, fixed, lint_time, fix_time = run_cycle(
+            changed, lint, settings, watcher, journal)
+        LOGGER.info(
+            "Cycle {0}: {1} changed, {2} messages, {3} fixed; lint {4:.0f} ms, "
+            "fix {5:.0f} ms, {6:.0f} ms from change to fixed".format(
+                cycle, len(changed), messages, fixed, lint_time * 1000,
+                fix_time * 1000, (time.time() - seen) * 1000))
+    return cycle
+
+
+def main(argv):
+    """ Entry point for `autopylint watch` """
+    from src.autopylint import DEFAULT_SETTINGS
+
+    option_list = [
+        make_option('--interval', dest="interval", type="float", default=0.5,
+                    metavar="SECONDS", help="How often to poll for changes"),
+        make_option('--debounce', dest="debounce", type="float", default=0.2,
+                    metavar="SECONDS", help="Wait until files have been quiet this long"),
+        make_option('--rcfile', dest="rcfile", default=None, metavar="FILE",
+                    help="pylint configuration file"),
+        make_option('--no-validate', dest="validate", action="store_false", default=True,
+                    help="Do not check that fixed files still compile before saving"),
+        make_option('--journal', dest="journal", default=None, metavar="FILE",
+                    help="Record the edits in FILE so `autopylint revert FILE` can undo them"),
+    ]
+    parser = OptionParser(
+        usage="%prog watch [options] path [path ...]",
+        option_list=option_list,
+        add_help_option=True
+    )
+    options, args = parser.parse_args(argv)
+    if not args:
+        parser.error("expected at least one path to watch")
+    try:
+        lint = WarmLinter(options.rcfile)
+    except ImportError:
+        LOGGER.error("autopylint watch needs pylint to be installed")
+        return 2
+
+    edit_journal = None
+    if options.journal:
+        from src.journal import Journal
+        edit_journal = Journal(options.journal)
+    settings = DEFAULT_SETTINGS._replace(validate=options.validate)
+    try:
+        watch(args, settings, lint, options.interval, options.debounce, edit_journal)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if edit_journal:
+            edit_journal.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,14 @@
+"""
+Shared test fixtures
+"""
+import pytest
+
+from src import registry
+
+
+@pytest.fixture(autouse=True)
+def plugin_cache(tmp_path, monkeypatch):
+    """ Keep the plugin cache that FN_TABLE writes out of the user's home directory """
+    cache = str(tmp_path / "plugins.json")
+    monkeypatch.setattr(registry, "PLUGIN_CACHE", cache)
+    return cache
@@ -0,0 +1,100 @@
+"""
+Test module for per-fixer fault isolation and post-fix validation
+"""
+import tracemalloc
+
+from src import autopylint
+from src.autopylint import DEFAULT_SETTINGS, StreamEditorAutoPylint, fix_module
+from src.item import Item
+from src.pipeline import SourceFile
+from src.registry import FixerRegistry
+
+
+def upper_case(editor, item):
+    line_no = item.line_no
+    editor.replace_range((line_no, line_no + 1), [editor.lines[line_no].upper()])
+    return (line_no, 0)
+
+
+def edits_then_raises(editor, item):
+    editor.replace_range((item.line_no, item.line_no + 1), ["broken"])
+    raise ValueError("fixer bug")
+
+
+def miscounts(editor, item):
+    editor.insert_range(item.line_no, ["# extra"])
+    return (item.line_no, 0)
+
+
+def breaks_syntax(editor, item):
+    editor.replace_range((item.line_no, item.line_no + 1), ["def ("])
+    return (item.line_no, 0)
+
+
+def make_fixers():
+    fixers = FixerRegistry({
+        "upper-case": "test_autopylint:upper_case",
+        "edits-then-raises": "test_autopylint:edits_then_raises",
+        "miscounts": "test_autopylint:miscounts",
+        "breaks-syntax": "test_autopylint:breaks_syntax",
+        "missing-plugin": "no_such_plugin.fixers:fixer",
+    })
+    fixers.loaded.update({
+        "upper-case": upper_case,
+        "edits-then-raises": edits_then_raises,
+        "miscounts": miscounts,
+        "breaks-syntax": breaks_syntax,
+    })
+    return fixers
+
+
+class TestFixPylint(object):
+    def test_failing_items_are_rolled_back_alone(self, monkeypatch):
+        monkeypatch.setattr(autopylint, "FN_TABLE", make_fixers())
+        source = SourceFile("m.py", b"", "utf-8", ["a = 1", "b = 2", "c = 3", "d = 4"])
+        items = [
+            Item("C", 0, 0, "Upper case", "upper-case"),
+            Item("C", 0, 0, "Needs a plugin", "missing-plugin"),
+            Item("C", 1, 0, "Raises", "edits-then-raises"),
+            Item("C", 2, 0, "Miscounts", "miscounts"),
+            Item("C", 3, 0, "Upper case", "upper-case"),
+        ]
+        editor = StreamEditorAutoPylint.fix_pylint("m.py", items, source)
+        assert editor.lines == ["A = 1", "b = 2", "c = 3", "D = 4"]
+        assert editor.changes == 2
+        assert sorted(name for name, _ in editor.failures) == [
+            "edits_then_raises", "miscounts", "missing-plugin"]
+
+    def test_broken_fix_is_blamed_and_reverted(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(autopylint, "FN_TABLE", make_fixers())
+        path = tmp_path / "m.py"
+        path.write_bytes(b"a = 1\nb = 2\nc = 3\n")
+        items = [
+            Item("C", 0, 0, "Upper case", "upper-case"),
+            Item("C", 1, 0, "Breaks syntax", "breaks-syntax"),
+            Item("C", 2, 0, "Upper case", "upper-case"),
+        ]
+        result = fix_module(str(path), items)
+        assert result.data is None
+        assert result.rejected[0] == "breaks_syntax"
+
+    def test_history_does_not_copy_lines(self, tmp_path):
+        path = tmp_path / "m.py"
+        path.write_bytes(b"x = 1   \n" * 9000)
+        items = [Item("C", i * 3, 0, "Trailing whitespace", "trailing-whitespace")
+                 for i in range(3000)]
+        tracemalloc.start()
+        try:
+            result = fix_module(str(path), items, DEFAULT_SETTINGS)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        assert result.changes == 3000
+        assert peak < 50 * 10 ** 6
+
+
+class TestMain(object):
+    def test_missing_report_fails_the_run(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        assert autopylint.main(["-j", "1", "--timings", str(tmp_path / "t.json"),
+                                "nonexistent.txt"]) == 1
@@ -0,0 +1,91 @@
+"""
+Test module for batch mode
+"""
+import json
+
+import pytest
+
+from src.batch import main, parse_args, read_manifest, round_jobs, run_batch
+
+
+REPORT = """\
+************* Module pkg.mod
+W:  1, 0: Unused path imported from os (unused-import)
+"""
+
+
+def make_repo(root, name):
+    (root / name / "pkg").mkdir(parents=True)
+    (root / name / "pkg" / "__init__.py").write_text("")
+    (root / name / "pkg" / "mod.py").write_text("from os import path, sep\nprint(sep)\n")
+    (root / "{0}.txt".format(name)).write_text(REPORT)
+
+
+class TestBatch(object):
+    def test_read_manifest(self, tmp_path):
+        manifest = tmp_path / "manifest"
+        manifest.write_text("# nightly\n\nrepo-a  a.txt\n/abs/b /abs/b.txt  # comment\n")
+        assert read_manifest(str(manifest)) == [
+            (str(tmp_path / "repo-a"), str(tmp_path / "a.txt")),
+            ("/abs/b", "/abs/b.txt"),
+        ]
+        manifest.write_text("repo-a\n")
+        with pytest.raises(ValueError):
+            read_manifest(str(manifest))
+
+    def test_run_batch_resolves_per_repository(self, tmp_path):
+        for name in ("a", "b"):
+            make_repo(tmp_path, name)
+        options, _ = parse_args([
+            "-j", "1", "--no-import-graph", "--timings", str(tmp_path / "t.json"), "manifest"])
+        repos = [(str(tmp_path / name), str(tmp_path / "{0}.txt".format(name))) for name in "ab"]
+        runs = run_batch(repos, options)
+        for name, run in zip("ab", runs):
+            assert (tmp_path / name / "pkg" / "mod.py").read_text() == "from os import sep\nprint(sep)\n"
+            assert (run.modules, run.saved) == (1, 1)
+        assert runs[0].cost_model is runs[1].cost_model
+
+    def test_main_writes_summaries(self, tmp_path):
+        make_repo(tmp_path, "a")
+        (tmp_path / "manifest").write_text("a a.txt\n")
+        summary = tmp_path / "summary.jsonl"
+        assert main(["-j", "2", "--no-import-graph", "--timings", str(tmp_path / "t.json"),
+                     "--summary", str(summary), str(tmp_path / "manifest")]) == 0
+        lines = summary.read_text().splitlines()
+        assert len(lines) == 1
+        result = json.loads(lines[0])
+        assert (result["root"], result["saved"], result["changes"]) == (str(tmp_path / "a"), 1, 1)
+
+    def test_bad_repository_does_not_stop_batch(self, tmp_path):
+        make_repo(tmp_path, "a")
+        # A missing report, and the same repository listed twice
+        (tmp_path / "manifest").write_text("a a.txt\nb missing.txt\na a.txt\n")
+        summary = tmp_path / "summary.jsonl"
+        main(["-j", "1", "--timings", str(tmp_path / "t.json"),
+              "--import-cache", str(tmp_path / "imports.json"),
+              "--summary", str(summary), str(tmp_path / "manifest")])
+        assert (tmp_path / "a" / "pkg" / "mod.py").read_text() == "from os import sep\nprint(sep)\n"
+        results = [json.loads(line) for line in summary.read_text().splitlines()]
+        assert [result["modules"] for result in results] == [1, 0, 1]
+        assert [len(result["errors"]) for result in results] == [0, 1, 0]
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_overlapping_reports_fix_a_file_in_turn(self, tmp_path, jobs):
+        make_repo(tmp_path, "a")
+        (tmp_path / "a" / "pkg" / "mod.py").write_text(
+            "from os import path, sep\nfrom sys import argv\nprint(sep)\n")
+        (tmp_path / "sys.txt").write_text(
+            "************* Module pkg.mod\nW:  2, 0: Unused argv imported from sys (unused-import)\n")
+        options, _ = parse_args(["-j", jobs, "--no-import-graph",
+                                 "--timings", str(tmp_path / "t.json"), "manifest"])
+        repos = [(str(tmp_path / "a"), str(tmp_path / name)) for name in ("a.txt", "sys.txt")]
+        runs = run_batch(repos, options)
+        assert (tmp_path / "a" / "pkg" / "mod.py").read_text() == "from os import sep\nprint(sep)\n"
+        assert [(run.modules, run.saved) for run in runs] == [(1, 1), (1, 1)]
+
+    def test_round_jobs_hold_back_files_in_flight(self):
+        pending = [("a", ("x.py", [])), ("b", ("x.py", [])), ("b", ("y.py", []))]
+        owner, later = {}, []
+        assert [job[0] for job in round_jobs(pending, owner, later)] == ["x.py", "y.py"]
+        assert owner == {"x.py": "a", "y.py": "b"}
+        assert later == [("b", ("x.py", []))]
@@ -0,0 +1,86 @@
+"""
+Test module for the line fix cache
+"""
+from collections import namedtuple
+
+from src import fix_cache
+from src.fix_cache import (
+    MISS,
+    LineFixCache,
+    line_fixer,
+    save_entries,
+)
+
+
+Item = namedtuple("Item", ["type", "line_no", "line_offset", "desc", "error"])
+
+
+class Editor(object):
+    def __init__(self, lines):
+        self.lines = lines
+
+    def replace_range(self, loc, new_lines):
+        self.lines = self.lines[:loc[0]] + new_lines + self.lines[loc[1]:]
+
+
+class TestFixCache(object):
+    def test_lru_eviction(self):
+        cache = LineFixCache(maxsize=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        assert cache.get("a") == [1]
+        cache.put("c", [3])
+        assert cache.get("b") is MISS
+        assert cache.get("c") == [3]
+        assert cache.take_stats()[:2] == (2, 1)
+
+    def test_line_fixer_memoises(self):
+        calls = []
+
+        @line_fixer
+        def split_semicolon(line, _):
+            calls.append(line)
+            return line.split("; ")
+
+        fix_cache.configure(maxsize=10)
+        editor = Editor(["a; b", "x", "a; b"])
+        item = Item("C", 2, 0, "More than one statement", "multiple-statements")
+        assert split_semicolon(editor, item) == (2, 1)
+        assert split_semicolon(editor, item._replace(line_no=0)) == (0, 1)
+        assert editor.lines == ["a", "b", "x", "a", "b"]
+        assert calls == ["a; b"]
+        assert split_semicolon.pure
+
+    def test_persistent_store(self, tmp_path):
+        store = str(tmp_path / "fixes")
+        cache = LineFixCache(store=store)
+        assert cache.get(("f", "e", "d", "line")) is MISS
+        cache.put(("f", "e", "d", "line"), ["fixed"])
+        save_entries(store, cache.take_stats()[2])
+
+        cache = LineFixCache(store=store)
+        assert cache.get(("f", "e", "d", "line")) == ["fixed"]
+        cache.close()
+
+    def test_trailing_whitespace_only_file_is_rewritten(self, tmp_path):
+        from src.autopylint import fix_module
+
+        path = tmp_path / "m.py"
+        path.write_bytes(b"x = 1   \ny = 2\n")
+        item = Item("C", 0, 0, "Trailing whitespace", "trailing-whitespace")
+        result = fix_module(str(path), [item])
+        assert result.changes == 1
+        assert result.data == b"x = 1\ny = 2\n"
+
+    def test_persistent_store_is_versioned(self, tmp_path, monkeypatch):
+        store = str(tmp_path / "fixes")
+        save_entries(store, [(("f", "e", "d", "line"), ["fixed"])])
+        monkeypatch.setattr(fix_cache, "CACHE_VERSION", fix_cache.CACHE_VERSION + 1)
+        cache = LineFixCache(store=store)
+        assert cache.get(("f", "e", "d", "line")) is MISS
+
+        save_entries(store, [(("f", "e", "d", "other"), ["new"])])
+        cache = LineFixCache(store=store)
+        assert cache.get(("f", "e", "d", "line")) is MISS
+        assert cache.get(("f", "e", "d", "other")) == ["new"]
+        cache.close()
@@ -0,0 +1,57 @@
+"""
+Test module for the git diff line index
+"""
+import pytest
+
+from src.git_diff import (
+    IntervalIndex,
+    hunk_ranges,
+)
+
+
+DIFF = """\
+diff --git a/pkg/mod.py b/pkg/mod.py
+index 3b18e51..a1c2d3e 100644
+--- a/pkg/mod.py
++++ b/pkg/mod.py
+@@ -3 +3 @@ import os
+-import sys
++import re
+@@ -10,0 +11,3 @@ def foo():
++    a = 1
++    b = 2
++    c = 3
+@@ -20,2 +23,0 @@ def bar():
+-    x = 1
+-    y = 2
+diff --git a/gone.py b/gone.py
+deleted file mode 100644
+--- a/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-a = 1
+-b = 2
+""".splitlines()
+
+
+class TestGitDiff(object):
+    def test_hunk_ranges(self):
+        assert hunk_ranges(DIFF) == {"pkg/mod.py": [(3, 3), (11, 13)]}
+
+    @pytest.mark.parametrize(
+        "line_no,expected",
+        [
+            (0, False),
+            (1, True),
+            (3, True),
+            (4, True),
+            (5, False),
+            (10, True),
+            (12, True),
+            (13, False),
+        ]
+    )
+    def test_interval_index(self, line_no, expected):
+        index = IntervalIndex([(10, 12), (1, 3), (4, 4), (2, 2)])
+        assert len(index) == 2
+        assert (line_no in index) == expected
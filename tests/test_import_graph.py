@@ -0,0 +1,137 @@
+"""
+Test module for the project-wide import graph
+"""
+import pickle
+
+import pytest
+
+from src import import_graph
+from src.item import Item
+from src.import_graph import ProjectGraphs, SavedGraph, build, project_cache, summarise
+from src.fixers.imports import relative_import, unused_import
+
+
+PROJECT = {
+    "pkg/__init__.py": "from pkg.core import helper\n__all__ = ['VERSION']\nVERSION = 1\n",
+    "pkg/core.py": "from os.path import join\nfrom pkg.util import strip, pad\n",
+    "pkg/util.py": "import os\nfrom string import ascii_letters, digits\n",
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/mod.py": "from .. import util\nimport pkg.core\nx = pkg.core.join\n",
+    "app.py": "import pkg.util as u\nprint(u.digits)\n",
+    "broken.py": "print 'python 2'\n",
+}
+
+
+class Editor(object):
+    def __init__(self, filename, lines):
+        self.filename = filename
+        self.lines = lines
+
+    def replace_range(self, loc, new_lines):
+        self.lines = self.lines[:loc[0]] + new_lines + self.lines[loc[1]:]
+
+    def delete_range(self, loc):
+        self.lines = self.lines[:loc[0]] + self.lines[loc[1] + 1:]
+
+
+@pytest.fixture
+def project(tmpdir, monkeypatch):
+    for path, text in PROJECT.items():
+        tmpdir.join(path).write(text, ensure=True)
+    monkeypatch.chdir(tmpdir)
+    yield tmpdir
+    import_graph.configure(None)
+
+
+class TestImportGraph(object):
+    def test_summarise(self):
+        summary = summarise("import a.b as c\nfrom . import d\n__all__ = ('e',)\nc.f.g()\n")
+        assert summary["imports"] == [["import", "a.b", None, "c", 0], ["from", "", "d", None, 1]]
+        assert summary["attrs"] == ["c.f", "c.f.g"]
+        assert summary["all"] == ["e"]
+
+    def test_reexports(self, project):
+        graph = build(".")
+        assert graph.is_reexported("pkg/core.py", "join")
+        assert graph.is_reexported("pkg/core.py", "helper")
+        assert not graph.is_reexported("pkg/core.py", "strip")
+        assert graph.is_reexported("pkg/util.py", "digits")
+        assert not graph.is_reexported("pkg/util.py", "ascii_letters")
+        assert graph.is_reexported("pkg/__init__.py", "VERSION")
+        assert ("pkg", "util") in graph.importers
+
+    def test_absolute(self, project):
+        graph = build(".")
+        assert graph.absolute("pkg/core.py", "util") == "pkg.util"
+        assert graph.absolute("pkg/sub/mod.py", "util") is None
+        assert graph.absolute("app.py", "pkg") is None
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_cache(self, project, monkeypatch, workers):
+        cache = str(project.join("cache", "imports.json"))
+        first = build(".", workers, cache)
+        project.join("pkg/util.py").write("import os\n")
+        calls = []
+        real = import_graph.summarise
+        monkeypatch.setattr(import_graph, "summarise", lambda *a: calls.append(a) or real(*a))
+        second = build(".", 1, cache)
+        assert len(calls) == 1
+        assert first.importers == second.importers
+
+    def test_project_graphs(self, project):
+        project.join("other", "pkg", "core.py").write("from pkg.core import nothing\n", ensure=True)
+        graphs = ProjectGraphs({".": build("."), "other": build("other")})
+        assert graphs.is_reexported("pkg/core.py", "join")
+        assert not graphs.is_reexported("other/pkg/core.py", "join")
+        assert graphs.absolute("pkg/core.py", "util") == "pkg.util"
+        assert graphs.absolute("/elsewhere/core.py", "util") is None
+        assert project_cache("a", "imports.json") != project_cache("b", "imports.json")
+
+    def test_unused_import_keeps_reexport(self, project):
+        import_graph.configure(build("."))
+        editor = Editor("pkg/core.py", ["from os.path import join, split"])
+        unused_import(editor, Item("W", 0, 0, "Unused join imported from os.path", "unused-import"))
+        assert editor.lines == ["from os.path import join, split"]
+        unused_import(editor, Item("W", 0, 0, "Unused split imported from os.path", "unused-import"))
+        assert editor.lines == ["from os.path import join"]
+
+    def test_relative_import(self, project):
+        import_graph.configure(build("."))
+        desc = "Relative import '{0}', should be 'wrong.{0}'"
+        editor = Editor("pkg/core.py", ["import util", "import string"])
+        relative_import(editor, Item("W", 1, 0, desc.format("string"), "relative-import"))
+        relative_import(editor, Item("W", 0, 0, desc.format("util"), "relative-import"))
+        assert editor.lines == ["import pkg.util", "import string"]
+
+    def test_graph_built_for_first_job_that_needs_it(self, project):
+        from src.autopylint import StreamEditorAutoPylint, parse_args
+        from src.git_diff import IntervalIndex
+
+        unused = Item("W", 0, 0, "Unused join imported from os.path", "unused-import")
+        whitespace = Item("C", 1, 0, "Trailing whitespace", "trailing-whitespace")
+        options, _ = parse_args(["--timings", str(project.join("t.json")),
+                                 "--import-cache", str(project.join("imports.json"))])
+        run = StreamEditorAutoPylint("report.txt", options)
+        run.graph = run.new_import_graph()
+        try:
+            run.make_job("pkg.util", [whitespace])
+            assert run.graph.graph is None
+            run.changed = {"pkg/core.py": IntervalIndex([(2, 2)])}
+            run.make_job("pkg.core", [unused, whitespace])
+            assert run.graph.graph is None
+            run.changed = {"pkg/core.py": IntervalIndex([(1, 2)])}
+            run.make_job("pkg.core", [unused, whitespace])
+            assert run.graph.is_reexported("pkg/core.py", "join")
+        finally:
+            run.graph.close()
+
+    def test_saved_graph_is_loaded_by_workers(self, project):
+        graph = SavedGraph(".")
+        try:
+            # Handed to the workers before the graph is built
+            worker = pickle.loads(pickle.dumps(graph))
+            graph.ensure()
+            assert worker.is_reexported("pkg/core.py", "join")
+            assert worker.absolute("pkg/core.py", "util") == "pkg.util"
+        finally:
+            graph.close()
@@ -0,0 +1,58 @@
+"""
+Test module for the edit journal
+"""
+import time
+
+from src.journal import (
+    Journal,
+    apply_patches,
+    revert,
+    reverse_patches,
+)
+
+
+BEFORE = b"import os\r\nimport sys  \r\n\r\ndef f(a,b):\r\n    return a\r\n"
+AFTER = b'import os\n\n\ndef f(a, b):\n    """ Doc """\n    return a\n'
+
+
+class TestJournal(object):
+    def test_reverse_patches(self):
+        before = ["a", "b", "c", "d", "e"]
+        after = ["a", "B", "c", "x", "y", "e"]
+        patches = reverse_patches(before, after)
+        assert apply_patches(after, patches) == before
+        assert all(start > 0 for start, _, _ in patches)
+
+    def test_reverse_patches_of_large_repetitive_file(self):
+        before = ["    x = 1   \n", "    pass\n", "\n"] * 5000
+        after = [line.rstrip() + "\n" if i % 7 else line for i, line in enumerate(before)]
+        del after[100:103]
+        start = time.time()
+        patches = reverse_patches(before, after)
+        assert time.time() - start < 5
+        assert apply_patches(after, patches) == before
+
+    def test_revert(self, tmp_path):
+        target = tmp_path / "mod.py"
+        target.write_bytes(BEFORE)
+        journal_file = str(tmp_path / "run.journal")
+
+        journal = Journal(journal_file)
+        target.write_bytes(AFTER)
+        journal.record(str(target), BEFORE, AFTER)
+        journal.close()
+
+        assert revert(journal_file) == 0
+        assert target.read_bytes() == BEFORE
+
+    def test_revert_refuses_modified_file(self, tmp_path):
+        target = tmp_path / "mod.py"
+        journal_file = str(tmp_path / "run.journal")
+
+        journal = Journal(journal_file)
+        journal.record(str(target), BEFORE, AFTER)
+        journal.close()
+
+        target.write_bytes(AFTER + b"x = 1\n")
+        assert revert(journal_file) == 1
+        assert target.read_bytes() == AFTER + b"x = 1\n"
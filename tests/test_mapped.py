@@ -0,0 +1,98 @@
+"""
+Test module for the memory-mapped editor backend
+"""
+import pytest
+
+from src.autopylint import DEFAULT_SETTINGS, Item, fix_module
+from src.mapped import open_mapped
+from src.pipeline import read_source
+
+
+SOURCES = [
+    b"a = 1  \nb = 2\n\n\nc = 3\n",
+    b"a = 1\r\nb = 2   \r\nc = 3",
+    b"\xef\xbb\xbfs = '\xc3\xa9'\nt = 2\n",
+    b"# -*- coding: latin-1 -*-\ns = '\xe9'\t\n",
+]
+
+
+@pytest.fixture(params=SOURCES)
+def mapped(request, tmp_path):
+    path = tmp_path / "m.py"
+    path.write_bytes(request.param)
+    source = open_mapped(str(path))
+    yield source, request.param, str(path)
+    source.close()
+
+
+class TestMappedSource(object):
+    def test_lines_match_list_backend(self, mapped):
+        source, _, filename = mapped
+        expected = read_source(filename).lines
+        assert list(source.lines) == expected
+        assert [source.lines[i] for i in range(len(expected))] == expected
+        assert source.lines[1:] == expected[1:]
+        assert source.lines[-1] == expected[-1]
+
+    def test_unedited_round_trip(self, mapped):
+        source, data, _ = mapped
+        assert source.lines.encode() == data
+
+    def test_edits_splice_bytes(self, mapped):
+        source, data, filename = mapped
+        expected = read_source(filename).lines
+        lines = source.lines.replace(1, 2, ["x = 0", "y = 0"]).replace(0, 0, ["# new"])
+        expected = ["# new"] + expected[:1] + ["x = 0", "y = 0"] + expected[2:]
+        assert list(lines) == expected
+        assert list(source.lines) == read_source(filename).lines
+        encoded = lines.encode()
+        newline = b"\r\n" if b"\r\n" in data else b"\n"
+        assert newline + b"x = 0" + newline + b"y = 0" + newline in encoded
+        assert encoded.endswith(data[source.offsets[2]:])
+        assert lines.replace(0, 1, []).encode().startswith(data[:source.offsets[1]])
+
+    def test_append_to_unterminated_file(self, tmp_path):
+        path = tmp_path / "m.py"
+        path.write_bytes(b"a = 1\r\nb = 2")
+        source = open_mapped(str(path))
+        assert source.lines.replace(2, 2, ["c = 3"]).encode() == b"a = 1\r\nb = 2\r\nc = 3\r\n"
+        source.close()
+
+    def test_unmappable(self, tmp_path):
+        for name, data in (("empty.py", b""), ("cr.py", b"a = 1\rb = 2\r")):
+            path = tmp_path / name
+            path.write_bytes(data)
+            assert open_mapped(str(path)) is None
+
+    def test_fix_module_keeps_untouched_bytes(self, tmp_path):
+        path = tmp_path / "big.py"
+        path.write_bytes(b"from os import path, sep\r\nx = 1   \r\nprint(sep)\r\n")
+        settings = DEFAULT_SETTINGS._replace(mmap_threshold=1)
+        item = Item("W", 0, 0, "Unused path imported from os", "unused-import")
+        result = fix_module(str(path), [item], settings)
+        assert result.original is None
+        assert result.data == b"from os import sep\r\nx = 1   \r\nprint(sep)\r\n"
+
+        result = fix_module(str(path), [item], DEFAULT_SETTINGS)
+        assert result.original == path.read_bytes()
+        assert result.data == b"from os import sep\nx = 1\nprint(sep)\n"
+
+    def test_trailing_whitespace_does_not_depend_on_size(self, tmp_path):
+        path = tmp_path / "m.py"
+        path.write_bytes(b"x = 1   \ny = 2\n")
+        items = [
+            Item("C", 0, 0, "Trailing whitespace", "trailing-whitespace"),
+            Item("C", 1, 0, "Missing module docstring", "missing-docstring"),
+        ]
+        mapped = fix_module(str(path), items, DEFAULT_SETTINGS._replace(mmap_threshold=1))
+        assert b"x = 1   " not in mapped.data
+        assert mapped.data == fix_module(str(path), items, DEFAULT_SETTINGS).data
+
+    def test_padded(self, mapped):
+        source, _, filename = mapped
+        with open(filename, "rb") as handle:
+            raw = handle.read().splitlines()
+        raw[0] = raw[0].lstrip(b"\xef\xbb\xbf")
+        assert [source.lines.padded(i) for i in range(len(raw))] == [
+            line != line.rstrip() for line in raw]
+        assert not source.lines.replace(0, 1, ["z = 0"]).padded(0)
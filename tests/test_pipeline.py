@@ -0,0 +1,70 @@
+"""
+Test module for the read-ahead and write-behind stages
+"""
+from src.pipeline import (
+    WriteBehind,
+    encode_lines,
+    read_ahead,
+)
+
+
+class TestPipeline(object):
+    def test_read_ahead_keeps_order(self, tmp_path):
+        filenames = []
+        for i in range(20):
+            path = tmp_path / "m{0}.py".format(i)
+            path.write_bytes("x = {0}  \r\n".format(i).encode("ascii"))
+            filenames.append(str(path))
+        filenames.insert(5, str(tmp_path / "missing.py"))
+
+        result = list(read_ahead(filenames, depth=3))
+        assert [filename for filename, _ in result] == filenames
+        assert isinstance(result[5][1], IOError)
+        assert result[0][1].lines == ["x = 0"]
+        assert result[-1][1].lines == ["x = 19"]
+
+    def test_source_encoding_round_trip(self, tmp_path):
+        path = tmp_path / "latin.py"
+        path.write_bytes(b"# -*- coding: latin-1 -*-\ns = '\xe9'\n")
+        (_, source), = read_ahead([str(path)])
+        assert source.encoding == "iso-8859-1"
+        assert encode_lines(source.lines, source.encoding) == source.data
+
+    def test_write_behind(self, tmp_path):
+        writer = WriteBehind(fsync=True, batch=2)
+        for i in range(5):
+            writer.put(str(tmp_path / "f{0}".format(i)), b"data")
+        writer.close()
+        assert not writer.errors
+        assert all((tmp_path / "f{0}".format(i)).read_bytes() == b"data" for i in range(5))
+
+    def test_write_behind_journals_before_writing(self, tmp_path):
+        from src.journal import Journal, revert
+
+        path = tmp_path / "m.py"
+        path.write_bytes(b"x = 1   \n")
+        journal = Journal(str(tmp_path / "run.journal"))
+        writer = WriteBehind(journal=journal)
+        writer.put(str(path), b"x = 1\n")
+        writer.close()
+        journal.close()
+        assert path.read_bytes() == b"x = 1\n"
+        assert revert(str(tmp_path / "run.journal")) == 0
+        assert path.read_bytes() == b"x = 1   \n"
+
+    def test_failed_writes_fail_the_run(self, tmp_path, monkeypatch):
+        from src import autopylint, pipeline
+
+        class FailingWriter(WriteBehind):
+            def put(self, filename, data, original=None):
+                self.errors.append((filename, IOError("disk full")))
+
+        path = tmp_path / "m.py"
+        path.write_bytes(b"x = 1   \n")
+        report = tmp_path / "report.txt"
+        report.write_text("************* Module m\nC:  1, 0: Trailing whitespace (trailing-whitespace)\n")
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(pipeline, "WriteBehind", FailingWriter)
+        assert autopylint.main(["-j", "1", "--timings", str(tmp_path / "t.json"),
+                                "--no-import-graph", str(report)]) == 1
+        assert path.read_bytes() == b"x = 1   \n"
@@ -0,0 +1,21 @@
+"""
+Test module guarding the regexes against super-linear backtracking
+"""
+from src.guard import LineTimeout, time_limit
+from src.regex_audit import audit
+
+
+class TestRegexAudit(object):
+    def test_no_super_linear_patterns(self):
+        slow = [result for result in audit(size=500) if result[-1]]
+        assert not slow, slow
+
+    def test_time_limit(self):
+        try:
+            with time_limit(0.05):
+                while True:
+                    pass
+        except LineTimeout:
+            pass
+        with time_limit(0.05):
+            pass
@@ -0,0 +1,128 @@
+"""
+Test module for fixing a module in parallel regions
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import autopylint
+from src.autopylint import (
+    DEFAULT_SETTINGS,
+    Item,
+    StreamEditorAutoPylint,
+    fix_module,
+    fix_split,
+    parse_args,
+)
+from src.editor import EditorOptions, RegionStreamEditor
+from src.pipeline import SourceFile
+from src.regions import (
+    RegionConflict,
+    boundaries,
+    map_line,
+    merge_edits,
+    region_bounds,
+    region_edits,
+    region_items,
+)
+
+
+def module_source(count):
+    """ A module of `count` classes, and the messages pylint reports for it """
+    lines, items = ["import os", ""], []
+    for i in range(count):
+        start = len(lines)
+        lines += [
+            "@decorate",
+            "class Thing{0}(object):".format(i),
+            "    def method(self, x):   ",
+            "        return x",
+            "",
+        ]
+        items += [
+            Item("C", start + 1, 0, "Missing class docstring", "missing-docstring"),
+            Item("C", start + 2, 0, "Trailing whitespace", "trailing-whitespace"),
+            Item("R", start + 2, 4, "Method could be a function", "no-self-use"),
+        ]
+    lines.append("print(os.sep)")
+    return "\n".join(lines) + "\n", items
+
+
+class TestRegions(object):
+    def test_boundaries_include_decorators(self):
+        lines = ["import os", "@a", "@b", "def f():", "    def g():", "        pass",
+                 "class C(object):", "    pass", "x = '''", "def h():", "'''"]
+        assert list(boundaries(lines)) == [1, 6, 9]
+
+    def test_bounds_balance_items(self):
+        source, items = module_source(8)
+        lines = source.splitlines()
+        bounds = region_bounds(lines, items, 4)
+        assert len(bounds) == 4
+        assert bounds[0][0] == 0 and bounds[-1][1] == len(lines)
+        assert all(lines[start] == "@decorate" for start, _ in bounds[1:])
+        assert [len(region) for region in region_items(bounds, items)] == [6] * 4
+
+    def test_region_edits(self):
+        lines = ["a", "b", "c", "d", "e"]
+        editor = RegionStreamEditor("m.py", EditorOptions(), SourceFile("m.py", b"", "utf-8", lines))
+        editor.replace_range((1, 2), ["B1", "B2"])
+        editor.delete_range((4, 4))
+        editor.insert_range(0, ["top"])
+        edits = region_edits(10, len(lines), editor.lines, editor.origin)
+        assert edits == [(10, 10, ["top"]), (11, 12, ["B1", "B2"]), (13, 14, [])]
+
+    def test_merge_conflicts(self):
+        edits = merge_edits([[(0, 2, ["x"])], [(2, 2, ["y"]), (5, 6, [])]])
+        assert edits == [(0, 2, ["x"]), (2, 2, ["y"]), (5, 6, [])]
+        assert map_line(edits, 4) == 4
+        assert map_line(edits, 7) == 6
+        with pytest.raises(RegionConflict):
+            map_line(edits, 5)
+        with pytest.raises(RegionConflict):
+            merge_edits([[(0, 3, ["x"])], [(2, 4, [])]])
+
+    @pytest.mark.parametrize("mmap_threshold", [0, 1])
+    def test_fix_split_matches_serial(self, tmp_path, mmap_threshold):
+        source, items = module_source(12)
+        path = tmp_path / "big.py"
+        path.write_text(source)
+        items.append(Item("W", 0, 0, "Unused path imported from os", "unused-import"))
+        settings = DEFAULT_SETTINGS._replace(mmap_threshold=mmap_threshold)
+
+        serial = fix_module(str(path), items, settings)
+        with ThreadPoolExecutor(4) as executor:
+            split = fix_split(executor, str(path), items, settings, parts=4)
+        assert split.data == serial.data
+        assert split.changes == serial.changes
+        assert b"    @staticmethod\n    def method(x):\n" in split.data
+        assert (split.failures, split.skipped, split.rejected) == (0, 0, None)
+        assert sum(samples for _, samples in split.timings.values()) == len(items)
+
+    def test_split_module_does_not_hold_up_dispatch(self, tmp_path, monkeypatch):
+        source, items = module_source(12)
+        path = tmp_path / "big.py"
+        path.write_text(source)
+        release = threading.Event()
+        fix_region = autopylint.fix_region
+
+        def slow_region(*args):
+            assert release.wait(10)
+            return fix_region(*args)
+
+        monkeypatch.setattr(autopylint, "fix_region", slow_region)
+        options, _ = parse_args(["-j", "4", "--split-messages", "10",
+                                 "--timings", str(tmp_path / "t.json")])
+        run = StreamEditorAutoPylint("report.txt", options)
+        small = ("small.py", items[:3])
+        with ThreadPoolExecutor(4) as executor, ThreadPoolExecutor(1) as splitter:
+            split = deque()
+            jobs = run.module_jobs(executor, splitter, [(str(path), items), small], split)
+            # The regions are still running, and the next module is handed out
+            assert next(jobs) == small + (run.settings, )
+            assert not split[0].done()
+            release.set()
+            result = split[0].result()
+        assert result.data == fix_module(str(path), items).data
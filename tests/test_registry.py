@@ -0,0 +1,75 @@
+"""
+Test module for the lazily loaded fixer registry
+"""
+import sys
+import json
+
+from src import registry
+from src.import_time import import_times
+from src.registry import FixerRegistry, cached_plugins
+
+
+SPECS = {
+    "trailing-whitespace": "src.fixers.whitespace:trailing_whitespace",
+    "no-op": "src.registry:no_op",
+}
+
+
+class TestFixerRegistry(object):
+    def test_lookup_loads_fixer(self):
+        table = FixerRegistry(SPECS)
+        assert "no-op" in table
+        assert not table.loaded
+        assert table["no-op"] is registry.no_op
+        assert table.get("missing") is None
+        assert sorted(table) == sorted(SPECS)
+
+    def test_plugins_override_builtins(self):
+        calls = []
+
+        def plugins():
+            calls.append(1)
+            return {"trailing-whitespace": "src.registry:no_op", "extra": "src.registry:load"}
+        table = FixerRegistry(SPECS, plugins)
+        assert len(table) == 3
+        assert "extra" in table
+        assert table["trailing-whitespace"] is registry.no_op
+        assert calls == [1]
+
+    def test_plugin_cache(self, tmpdir, monkeypatch):
+        cache = str(tmpdir.join("sub", "plugins.json"))
+        found = [{"a": "m:f"}, {"b": "m:g"}]
+        monkeypatch.setattr(registry, "discover_plugins", lambda: found.pop(0))
+        assert cached_plugins(cache) == {"a": "m:f"}
+        assert cached_plugins(cache) == {"a": "m:f"}
+        with open(cache) as handle:
+            stale = json.load(handle)
+        stale["fingerprint"] = []
+        with open(cache, "w") as handle:
+            json.dump(stale, handle)
+        assert cached_plugins(cache) == {"b": "m:g"}
+
+
+# Modules that importing src.autopylint may load, standard library included
+STARTUP_MODULES = 90
+
+
+class TestImportTime(object):
+    def test_startup_imports(self):
+        loaded = import_times("src.autopylint")
+        assert "src.autopylint" in loaded
+        heavy = ("src.fixers.", "src.journal", "src.git_diff", "multiprocessing", "subprocess",
+                 "concurrent.futures.process", "sed", "src.editor", "src.pipeline",
+                 "src.scheduler", "src.regions", "src.mapped", "src.fix_cache",
+                 "src.import_graph", "src.report_lexer")
+        assert [name for name in loaded if name.startswith(heavy)] == []
+        # The baseline, before the run machinery was added, loaded 117 modules
+        # (most of them for sed); startup must stay well below that.
+        assert len(loaded) <= STARTUP_MODULES
+
+    def test_builtin_specs_resolve(self):
+        if sys.version_info[0] < 3:
+            return
+        table = FixerRegistry(registry.BUILTIN_FIXERS)
+        for code in table:
+            assert callable(table[code])
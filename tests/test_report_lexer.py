@@ -0,0 +1,51 @@
+"""
+Test module for the pylint report lexer
+"""
+from src.item import Item
+from src.report_lexer import lex_report, main, parse_report
+
+
+REPORT = """\
+No config file found, using default configuration
+************* Module pkg.mod
+C: 75, 0: Unnecessary parens after 'print' keyword (superfluous-parens)
+C: 14, 0: Too many lines in module (6953/1000) (too-many-lines)
+C:  3, 8: Wrong hanging indentation (add 4 spaces).
+        x = (1,
+        ^   | (bad-continuation)
+W:  9, 4: Unused variable 'y' (unused-variable)
+C: 20, 0: Exactly one space required around assignment
+a=1
+W: 21, 0: Unused import os (unused-import)
+************* Module empty
+************* Module other
+W:  1, 0: Unused import sys (unused-import)
+-----------------------------------
+Your code has been rated at 5.00/10
+"""
+
+
+class TestReportLexer(object):
+    def test_items(self):
+        items = list(lex_report(REPORT.splitlines(True)))
+        assert items == [
+            ("pkg.mod", Item("C", 74, 0, "Unnecessary parens after 'print' keyword",
+                             "superfluous-parens")),
+            ("pkg.mod", Item("C", 13, 0, "Too many lines in module (6953/1000)",
+                             "too-many-lines")),
+            ("pkg.mod", Item("C", 2, 8, "Wrong hanging indentation (add 4 spaces).",
+                             "bad-continuation")),
+            ("pkg.mod", Item("W", 8, 4, "Unused variable 'y'", "unused-variable")),
+            ("pkg.mod", Item("W", 20, 0, "Unused import os", "unused-import")),
+            ("other", Item("W", 0, 0, "Unused import sys", "unused-import")),
+        ]
+
+    def test_modules(self):
+        modules = list(parse_report(REPORT.splitlines(True)))
+        assert [(module, len(items)) for module, items in modules] == [("pkg.mod", 5), ("other", 1)]
+
+    def test_benchmark(self, tmp_path, capsys):
+        report = tmp_path / "report"
+        report.write_text(REPORT * 10)
+        assert main(["-n", "1", str(report)]) == 0
+        assert "160 lines, 20 modules, 60 messages" in capsys.readouterr().out
@@ -0,0 +1,100 @@
+"""
+Test module for the cost model and scheduler
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.autopylint import Item
+from src.scheduler import (
+    BYTES,
+    CostModel,
+    WorkQueue,
+    dispatch,
+)
+
+
+def items(error, count):
+    return [Item("C", 0, 0, "desc", error)] * count
+
+
+class TestScheduler(object):
+    def test_largest_first(self, tmp_path):
+        small, big = tmp_path / "small.py", tmp_path / "big.py"
+        small.write_text("x = 1\n")
+        big.write_text("x = 1\n" * 1000)
+        model = CostModel({
+            "cheap": [1.0, 1000],
+            "dear": [1.0, 10],
+            BYTES: [1.0, 10 ** 6],
+        })
+        jobs = [
+            (str(small), items("cheap", 5)),
+            (str(small), items("dear", 5)),
+            (str(big), items("cheap", 5)),
+        ]
+        assert list(WorkQueue(jobs, model, window=len(jobs))) == [jobs[1], jobs[2], jobs[0]]
+
+    def test_update_and_reload(self, tmp_path):
+        timings = str(tmp_path / "cache" / "timings.json")
+        model = CostModel.load(timings)
+        model.update({"dear": [2.0, 4]})
+        model.update({"dear": [1.0, 1]})
+        model.save(timings)
+        assert CostModel.load(timings).unit_cost("dear", None) == 0.6
+
+    def test_timings_kept_only_when_asked(self, tmp_path, monkeypatch):
+        from src import autopylint
+        saved = []
+        monkeypatch.setattr(CostModel, "save", lambda self, filename: saved.append(filename))
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "m.py").write_text("x = 1   \n")
+        report = tmp_path / "report.txt"
+        report.write_text("************* Module m\nC:  1, 0: Trailing whitespace (trailing-whitespace)\n")
+        assert autopylint.main(["-j", "1", "--no-import-graph", str(report)]) == 0
+        assert saved == []
+        timings = str(tmp_path / "timings.json")
+        assert autopylint.main(["-j", "1", "--no-import-graph", "--timings", timings,
+                                str(report)]) == 0
+        assert saved == [timings]
+
+    def test_dispatch(self):
+        with ThreadPoolExecutor(2) as executor:
+            jobs = [(i, ) for i in range(10)]
+            result = dispatch(executor, lambda x: x * x, jobs, 3)
+            assert sorted(result) == [i * i for i in range(10)]
+
+    def test_work_queue_parses_lazily(self, tmp_path):
+        parsed = []
+
+        def jobs():
+            for i in range(10):
+                parsed.append(i)
+                yield (str(tmp_path / "m{0}.py".format(i)), items("e", i % 4))
+        queue = iter(WorkQueue(jobs(), CostModel(), window=3))
+        first = next(queue)
+        assert parsed == [0, 1, 2]
+        assert first[0].endswith("m2.py")
+        rest = list(queue)
+        assert len(rest) == 9
+        assert parsed == list(range(10))
+
+    def test_dispatch_byte_limit(self, tmp_path):
+        jobs = []
+        for i in range(6):
+            path = tmp_path / "m{0}.py".format(i)
+            path.write_bytes(b"x" * 100)
+            jobs.append((str(path), ))
+        lock = threading.Lock()
+        running, peak = [0], [0]
+
+        def fn(_):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            threading.Event().wait(0.01)
+            with lock:
+                running[0] -= 1
+            return 1
+        with ThreadPoolExecutor(4) as executor:
+            assert sum(dispatch(executor, fn, jobs, 4, max_bytes=200)) == 6
+        assert peak[0] == 2
@@ -0,0 +1,73 @@
+"""
+Test module for report statistics
+"""
+import json
+
+import pytest
+
+from src import stats
+from src.stats import load_counts, main, parse_counts, statistics
+
+
+REPORT = """\
+************* Module pkg.mod
+C:  1, 0: Missing module docstring (missing-docstring)
+W:  2, 0: Unused import os (unused-import)
+C:  5, 0: Trailing whitespace (trailing-whitespace)
+C:  6, 0: Trailing whitespace (trailing-whitespace)
+************* Module pkg.empty
+************* Module other
+R:  3, 4: Too many branches (14/12) (too-many-branches)
+C:  4, 0: Invalid constant name 'x' (invalid-name)
+------------------------------------------------------------------
+Your code has been rated at 5.00/10
+"""
+
+
+@pytest.fixture
+def report(tmp_path):
+    path = tmp_path / "report"
+    path.write_text(REPORT)
+    return str(path)
+
+
+class TestStats(object):
+    def test_parse_counts(self, report):
+        assert parse_counts(report) == {
+            "pkg.mod": [["C", "missing-docstring", 1], ["C", "trailing-whitespace", 2],
+                        ["W", "unused-import", 1]],
+            "other": [["C", "invalid-name", 1], ["R", "too-many-branches", 1]],
+        }
+
+    def test_statistics(self, report):
+        result = statistics(parse_counts(report))
+        assert (result["messages"], result["modules"]) == (6, 2)
+        assert (result["fixable"], result["not_fixable"]) == (4, 2)
+        assert result["projected"] == {"edits": 4, "files": 1}
+        assert result["by_type"] == {"C": 4, "W": 1, "R": 1}
+        assert list(result["by_code"])[0] == "trailing-whitespace"
+        assert result["by_code"]["too-many-branches"] == {"count": 1, "fixable": False}
+        assert result["by_code"]["invalid-name"] == {"count": 1, "fixable": False}
+        assert result["by_module"] == {"pkg.mod": 4, "other": 2}
+
+        result = statistics(parse_counts(report), codes={"unused-import"}, prefix="pkg")
+        assert (result["messages"], result["projected"]["files"]) == (1, 1)
+        assert statistics(parse_counts(report), prefix="pk")["messages"] == 0
+        assert list(statistics(parse_counts(report), top=1)["by_module"]) == ["pkg.mod"]
+
+    def test_cache(self, report, tmp_path, monkeypatch):
+        cache_dir = str(tmp_path / "cache")
+        first = load_counts(report, cache_dir)
+        monkeypatch.setattr(stats, "parse_counts", lambda _: pytest.fail("report read again"))
+        assert load_counts(report, cache_dir) == first
+
+        with open(report, "a") as handle:
+            handle.write("************* Module new\nC:  1, 0: Line too long (120/100) (line-too-long)\n")
+        monkeypatch.setattr(stats, "parse_counts", parse_counts)
+        assert "new" in load_counts(report, cache_dir)
+
+    def test_main(self, report, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(stats, "STATS_CACHE", str(tmp_path / "cache"))
+        assert main(["--code", "trailing-whitespace", report]) == 0
+        result = json.loads(capsys.readouterr().out)
+        assert (result["messages"], result["report"]) == (2, report)
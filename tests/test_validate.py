@@ -0,0 +1,22 @@
+"""
+Test module for post-fix validation
+"""
+from src.validate import (
+    check_source,
+    first_failure,
+)
+
+
+GOOD = ["def f(a):", "    return a"]
+BAD = ["def f(a)", "    return a"]
+
+
+class TestValidate(object):
+    def test_check_source(self):
+        assert check_source("x.py", "\n".join(GOOD)) is None
+        assert check_source("x.py", "\n".join(BAD)).startswith("SyntaxError")
+
+    def test_first_failure(self):
+        snapshots = [GOOD, GOOD, BAD, BAD, BAD]
+        assert first_failure("x.py", snapshots) == 2
+        assert first_failure("x.py", [BAD]) == 0
@@ -0,0 +1,93 @@
+"""
+Test module for watch mode
+"""
+import os
+import threading
+from collections import namedtuple
+
+from src.autopylint import DEFAULT_SETTINGS
+from src.watch import FileWatcher, message_items, run_cycle, watch
+
+
+Message = namedtuple("Message", ["path", "line", "column", "msg", "symbol", "C"])
+
+
+def unused_path(filename):
+    return Message(filename, 1, 0, "Unused path imported from os", "unused-import", "W")
+
+
+class TestWatch(object):
+    def test_poll_reports_content_changes(self, tmp_path):
+        a, b = tmp_path / "a.py", tmp_path / "b.py"
+        a.write_text("x = 1\n")
+        b.write_text("y = 1\n")
+        watcher = FileWatcher([str(tmp_path)])
+        assert watcher.poll() == {str(a), str(b)}
+        assert watcher.poll() == set()
+
+        os.utime(str(a), (0, 0))
+        assert watcher.poll() == set()
+        b.write_text("y = 22\n")
+        c = tmp_path / "c.py"
+        c.write_text("z = 1\n")
+        assert watcher.poll() == {str(b), str(c)}
+        b.unlink()
+        assert watcher.poll() == set()
+        assert str(b) not in watcher.stats
+
+    def test_message_items(self):
+        items = message_items([unused_path("./a.py")])
+        assert list(items) == ["a.py"]
+        assert items["a.py"][0].line_no == 0
+        assert items["a.py"][0].error == "unused-import"
+
+    def test_run_cycle_fixes_changed_files(self, tmp_path):
+        a = tmp_path / "a.py"
+        a.write_text("from os import path, sep\nprint(sep)\n")
+        watcher = FileWatcher([str(tmp_path)])
+        changed = watcher.poll()
+        linted = []
+
+        def lint(filenames):
+            linted.append(sorted(filenames))
+            return [unused_path(filename) for filename in filenames]
+        messages, fixed, _, _ = run_cycle(changed, lint, DEFAULT_SETTINGS, watcher)
+        assert (messages, fixed) == (1, 1)
+        assert linted == [[str(a)]]
+        assert a.read_text() == "from os import sep\nprint(sep)\n"
+        # Our own write is not a change
+        assert watcher.poll() == set()
+
+    def test_watch_cycles(self, tmp_path):
+        a = tmp_path / "a.py"
+        a.write_text("x = 1\n")
+        calls = []
+
+        def lint(filenames):
+            calls.append(sorted(filenames))
+            if len(calls) == 1:
+                # An edit made while a cycle runs is picked up by the next one
+                a.write_text("x = 3\n")
+            return []
+        timer = threading.Timer(0.05, a.write_text, ["x = 2\n"])
+        timer.start()
+        assert watch([str(tmp_path)], DEFAULT_SETTINGS, lint,
+                     interval=0.01, debounce=0.01, cycles=2) == 2
+        timer.join()
+        assert calls == [[str(a)], [str(a)]]
+
+    def test_main_shows_info_reports(self, tmp_path, monkeypatch):
+        import logging
+        from src import autopylint
+
+        root = logging.getLogger()
+        monkeypatch.setattr(root, "handlers", list(root.handlers))
+        monkeypatch.setattr(root, "level", logging.WARNING)
+        monkeypatch.delenv("LOGCFG", raising=False)
+        assert autopylint.main(["--timings", str(tmp_path / "t.json")]) == 0
+        assert root.getEffectiveLevel() == logging.INFO
+        assert autopylint.main(["-v", "--timings", str(tmp_path / "t.json")]) == 0
+        assert root.getEffectiveLevel() == logging.DEBUG
+        monkeypatch.setenv("LOGCFG", "WARNING")
+        assert autopylint.main(["--timings", str(tmp_path / "t.json")]) == 0
+        assert root.getEffectiveLevel() == logging.WARNING